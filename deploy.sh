@@ -13,6 +13,7 @@ clean() {
 }
 
 deploy() {
+    python3 -m pico_copilot.modules.animations.compiler
     rshell --quiet cp -r "$PWD"/pico_copilot /pyboard
     rshell --quiet cp -r "$PWD"/bh1750 /pyboard
     rshell --quiet cp "$PWD"/*.py /pyboard/
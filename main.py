@@ -11,13 +11,17 @@ from pico_copilot.utils.failsafe_loop import failsafe_loop
 
 BOARD = Board(BOARD_CONFIG)
 BOARD_INTERFACE = BoardInterface(BOARD, BOARD_CONFIG)
+# leds are rendered and written by the second core
+DUAL_CORE = False
 
 
 async def control_module_clear_start():
     """Start the system."""
     state = STATE
     # LOG.debug(f'INIT STATE: {state}')
-    control_module = ControlModule(BOARD_INTERFACE, state)
+    control_module = ControlModule(BOARD_INTERFACE,
+                                   state,
+                                   dual_core=DUAL_CORE)
     await control_module.start()
 
 
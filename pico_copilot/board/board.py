@@ -1,9 +1,15 @@
 """Board."""
 
 from pico_copilot.utils.logger import LOG
+from pico_copilot.board.calibration import compile_lut, lut_duty
+from pico_copilot.board.edges import EdgeBuffer
 from pico_copilot.board.light_sensor import LightSensor
+from pico_copilot.board.ramp import Ramps
+from pico_copilot.board.strip import Strip
+from pico_copilot.board.ws2812 import Ws2812
+from pico_copilot.utils.clock import ticks_ms
 
-from machine import Pin, PWM
+from machine import Pin, PWM, Timer
 
 
 class Board:
@@ -14,43 +20,128 @@ class Board:
         """Board initialization."""
         self._config = config
 
-        self._leds = {}
+        # leds of all groups in a flat list, handles are indexes
+        self._channels = []
+        # duty lookup tables of calibrated leds, None if not calibrated,
+        # leds with the same calibration share a table
+        self._luts = []
+        luts = {}
+        self._handles = {}
+        # channels of led groups in the order of their frames and strips,
+        # group handles are indexes
+        self._groups = []
         for led_group, led_group_data in config['leds'].items():
-            self._leds[led_group] = {}
             for led_name, led_config in led_group_data['leds'].items():
                 if led_config['pin'] == 'LED':
-                    self._leds[led_group][led_name] = Pin(
-                        led_config['pin'],
-                        Pin.OUT)
+                    channel = Pin(led_config['pin'], Pin.OUT)
                 else:
                     # LOG.debug(f'Setting led {led_group} {led_name}')
                     # LOG.debug(f"led_config {led_config}")
-                    self._leds[led_group][led_name] = PWM(
-                        Pin(led_config['pin'],
-                            Pin.OUT))
-                    self._leds[led_group][led_name].freq(self.DEFAULT_PWM_FREQ)
+                    channel = PWM(Pin(led_config['pin'], Pin.OUT))
+                    channel.freq(self.DEFAULT_PWM_FREQ)
+                self._handles[led_name] = len(self._channels)
+                self._channels.append(channel)
+                calibration = led_config.get('calibration')
+                lut = None
+                if calibration:
+                    key = tuple(sorted(calibration.items()))
+                    if key not in luts:
+                        luts[key] = compile_lut(calibration)
+                    lut = luts[key]
+                self._luts.append(lut)
+
+        # addressable strips are written as whole groups
+        self._strips = []
+        self._strip_handles = {}
+        for strip_name, strip_config in config.get('strips', {}).items():
+            strip = Strip(strip_config['pixels'],
+                          Ws2812(strip_config['pin']),
+                          strip_config.get('color', (255, 255, 255)),
+                          strip_config.get('order', 'GRB'))
+            self._strip_handles[strip_name] = len(self._groups)
+            self._groups.append(strip)
+            self._strips.append(strip)
+
+        # fades run from a timer instead of the control loop
+        self._ramps = Ramps(len(self._channels), self._write_channel, Timer())
 
         self._light_sensor = LightSensor(self._config)
 
         self._button1 = Pin(config['buttons']['button1']['pin'],
                             Pin.IN,
                             Pin.PULL_UP)
+        # clicks are timed from edges instead of polling the pin
+        self._button_edges = EdgeBuffer()
+        self._button_handler = None
+        self._button1.irq(handler=self._on_button_edge,
+                          trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING)
 
         # TBD: add
         # self.onboard_led = Pin("LED", Pin.OUT)
 
-    def set_led_brightness(self, name, brightness):
-        # LOG.debug(f'HW set led brightness of {name} to {brightness}')
+    def get_led_handle(self, name):
+        """Return a led handle to write with or None if it is unknown."""
+        handle = self._handles.get(name)
+        if handle is None:
+            LOG.warning(f'Unknown led name {name}')
+        return handle
+
+    def add_led_group(self, handles):
+        """Return a group handle to write frames of these leds with."""
+        channels = tuple(None if handle is None else self._channels[handle]
+                         for handle in handles)
+        luts = tuple(None if handle is None else self._luts[handle]
+                     for handle in handles)
+        self._groups.append((tuple(handles), channels, luts))
+        return len(self._groups) - 1
+
+    def get_strip_handle(self, name):
+        """Return a group handle of a strip or None if it is unknown."""
+        handle = self._strip_handles.get(name)
+        if handle is None:
+            LOG.warning(f'Unknown strip name {name}')
+        return handle
+
+    def set_frame(self, group_handle, duties):
+        """Set 0..65535 duties of all leds or pixels of a group."""
+        group = self._groups[group_handle]
+        if isinstance(group, Strip):
+            # sent by the next flush
+            group.set_frame(duties)
+            return
+
+        handles, channels, luts = group
+        self._ramps.written_frame(handles, duties)
+        for index in range(len(channels)):
+            channel = channels[index]
+            if channel is None:
+                continue
+            lut = luts[index]
+            if lut is None:
+                channel.duty_u16(duties[index])
+            else:
+                channel.duty_u16(lut_duty(lut, duties[index]))
+
+    def set_led_duty(self, handle, duty):
+        """Set a 0..65535 PWM duty of a led."""
+        # LOG.debug(f'HW set led duty of {handle} to {duty}')
+        self._ramps.written(handle, duty)
+        self._write_channel(handle, duty)
 
-        known_name = False
-        for led_group_name, led_group_data in self._leds.items():
-            if name in led_group_data:
-                known_name = True
-                # LOG.debug(f'turning "{name}" on: ')
-                # LOG.debug(f'{led_group_data}')
-                led_group_data[name].duty_u16(self._get_duty(brightness))
-        if not known_name:
-            LOG.warning('Unknown led name')
+    def ramp_led_duty(self, handle, duty, duration):
+        """Ramp a led from its current duty to a 0..65535 one in ms."""
+        self._ramps.start(handle, duty, duration)
+
+    def flush(self):
+        """Send framebuffers of strips changed since the last flush."""
+        for strip in self._strips:
+            strip.flush()
+
+    def _write_channel(self, handle, duty):
+        lut = self._luts[handle]
+        if lut is not None:
+            duty = lut_duty(lut, duty)
+        self._channels[handle].duty_u16(duty)
 
     def get_light_sensor(self):
         """Return brightness from 0.0 to 1.0."""
@@ -63,13 +154,22 @@ class Board:
         #            f'(from {sensor_data})')
         return value
 
+    def set_button_handler(self, handler):
+        """Call handler(pin) on button edges, from an interrupt."""
+        self._button_handler = handler
+
+    def get_button_edges(self):
+        """Return the buffer of timestamped button edges."""
+        return self._button_edges
+
+    def _on_button_edge(self, pin):
+        """Button interrupt, records the edge."""
+        self._button_edges.push(ticks_ms(), pin.value() == 0)
+        if self._button_handler:
+            self._button_handler(pin)
+
     def get_button_state(self):
         pressed = self._button1.value() == 0
         # if pressed:
         #     LOG.debug('HW Button was pressed')
         return pressed
-
-    def _get_duty(self, brightness):
-        """Get duty value from 0.0-1.0 brightness range."""
-        duty_max = 65535
-        return round(duty_max * brightness)
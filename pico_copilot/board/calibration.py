@@ -0,0 +1,69 @@
+"""
+Led calibration.
+
+Calibration of a led in the board config is compiled at startup
+into a lookup table of PWM duties at 256 steps of a duty, duties
+between the steps are interpolated so that dim fades do not step.
+The table starts at the minimum duty, only a zero duty is off:
+    'calibration': {
+        'gamma': 2.2,          # duty ** gamma, 1.0 is linear
+        'perceptual': False,   # CIE 1931 lightness instead of gamma
+        'min_duty': 0,         # the dimmest visible duty, 0 is still off
+        'max_duty': 65535,
+    }
+"""
+
+from array import array
+
+from pico_copilot.utils.fixed import MAX_DUTY
+
+LUT_STEPS = 256
+# entries at both ends of every step
+LUT_SIZE = LUT_STEPS + 1
+# 16 bit duty to a table index and a fraction of a step
+LUT_SHIFT = 8
+LUT_MASK = (1 << LUT_SHIFT) - 1
+
+
+def _lightness(value):
+    """Return luminance of a 0.0-1.0 perceived lightness, CIE 1931."""
+    lightness = value * 100
+    if lightness <= 8:
+        return lightness / 903.3
+    return ((lightness + 16) / 116) ** 3
+
+
+def compile_lut(calibration):
+    """Return a duty lookup table of a led calibration."""
+    gamma = calibration.get('gamma', 1.0)
+    perceptual = calibration.get('perceptual', False)
+    min_duty = calibration.get('min_duty', 0)
+    max_duty = calibration.get('max_duty', MAX_DUTY)
+    if not 0 <= min_duty <= max_duty <= MAX_DUTY:
+        raise ValueError(f'Duty range {min_duty}-{max_duty} is out of '
+                         f'0-{MAX_DUTY}')
+    if gamma <= 0:
+        raise ValueError(f'Gamma should be > 0, got {gamma}')
+
+    lut = array('H', [0] * LUT_SIZE)
+    for index in range(LUT_SIZE):
+        value = index / LUT_STEPS
+        if perceptual:
+            value = _lightness(value)
+        else:
+            value = value ** gamma
+        lut[index] = min_duty + round(value * (max_duty - min_duty))
+    return lut
+
+
+def lut_duty(lut, duty):
+    """Return a calibrated PWM duty of a 0..65535 duty."""
+    if not duty:
+        return 0
+    # 65535 is scaled to the last entry
+    position = duty + (duty >> 15)
+    index = position >> LUT_SHIFT
+    low = lut[index]
+    if index == LUT_STEPS:
+        return low
+    return low + ((lut[index + 1] - low) * (position & LUT_MASK) >> LUT_SHIFT)
@@ -1,36 +1,51 @@
 """Config."""
 
+# see pico_copilot.board.calibration
+_STRIP_CALIBRATION = {
+    'perceptual': True,
+    'min_duty': 0,
+    'max_duty': 65535,
+}
+
 BOARD_CONFIG = {
     'leds': {
         'tail': {
             'leds': {
                 'tail_1': {
-                    'pin': 18
+                    'pin': 18,
+                    'calibration': _STRIP_CALIBRATION,
                 },
                 'tail_2': {
-                    'pin': 19
+                    'pin': 19,
+                    'calibration': _STRIP_CALIBRATION,
                 },
                 'tail_3': {
-                    'pin': 20
+                    'pin': 20,
+                    'calibration': _STRIP_CALIBRATION,
                 },
                 'tail_4': {
-                    'pin': 21
+                    'pin': 21,
+                    'calibration': _STRIP_CALIBRATION,
                 },
             }
         },
         'front': {
             'leds': {
                 'front_1': {
-                    'pin': 14
+                    'pin': 14,
+                    'calibration': _STRIP_CALIBRATION,
                 },
                 'front_2': {
-                    'pin': 15
+                    'pin': 15,
+                    'calibration': _STRIP_CALIBRATION,
                 },
                 'front_3': {
-                    'pin': 16
+                    'pin': 16,
+                    'calibration': _STRIP_CALIBRATION,
                 },
                 'front_4': {
-                    'pin': 17
+                    'pin': 17,
+                    'calibration': _STRIP_CALIBRATION,
                 },
             }
         },
@@ -42,6 +57,10 @@ BOARD_CONFIG = {
             }
         }
     },
+    # addressable strips, a strip of a group shows its frames, e.g.
+    # 'tail_strip': {'pin': 13, 'pixels': 30, 'color': (255, 0, 0),
+    #                'order': 'GRB', 'group': 'tail'},
+    'strips': {},
     'sensors': {
         'light': {
             'sda': 26,
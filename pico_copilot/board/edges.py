@@ -0,0 +1,22 @@
+"""
+Timestamped button edges.
+
+Pin interrupts push edges into a preallocated ring buffer, the control
+loop pops them, see utils.ring. Edges which do not fit are dropped and
+counted.
+"""
+
+from array import array
+
+from pico_copilot.utils.ring import RingBuffer
+
+DEFAULT_SIZE = 16
+
+
+class EdgeBuffer(RingBuffer):
+    """Ring buffer of (ticks_ms time, pressed) button edges."""
+
+    def __init__(self, size=DEFAULT_SIZE):
+        """Buffer initialization, holds size - 1 edges."""
+        # ticks_ms values, below 2 ** 30 on the board, and bools
+        super().__init__(array('l', [0] * size), [False] * size)
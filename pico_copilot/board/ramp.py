@@ -0,0 +1,108 @@
+"""
+Hardware timed ramps.
+
+Linear duty ramps of led channels run from a timer callback,
+the control loop only starts them. All the state is preallocated,
+the callback does not allocate.
+
+The callback interrupts the control loop between any two bytecodes.
+Channels are handed over by their single byte active flag only: the
+loop sets up a ramp while its flag is clear and sets it last, the
+callback clears it when the ramp ends. No counter is shared, the
+callback finds out itself whether any ramp is left.
+"""
+
+from array import array
+
+from pico_copilot.utils.fixed import SCALE
+from pico_copilot.utils.timer import Timer
+
+DEFAULT_PERIOD = 5
+
+
+class Ramps:
+    """Duty ramps of all led channels driven by a single timer."""
+
+    def __init__(self, channel_count, write, timer, period=DEFAULT_PERIOD):
+        """Ramps initialization, write(handle, duty) sets a channel."""
+        self._write = write
+        self._timer = timer
+        self._period = period
+        # bound once, not on every timer start
+        self._callback = self._tick
+        self._running = False
+
+        # the last duty of every channel, ramps start from it
+        self.duties = array('H', [0] * channel_count)
+        self._start = array('H', [0] * channel_count)
+        self._target = array('H', [0] * channel_count)
+        self._elapsed = array('i', [0] * channel_count)
+        self._duration = array('i', [0] * channel_count)
+        self._active = bytearray(channel_count)
+
+    def start(self, handle, target, duration):
+        """Ramp a channel from its current duty to a target in ms."""
+        if duration <= 0:
+            self.written(handle, target)
+            self._write(handle, target)
+            return
+
+        # a running ramp is taken over, the callback does not see
+        # it half set
+        self._active[handle] = 0
+        self._start[handle] = self.duties[handle]
+        self._target[handle] = target
+        self._elapsed[handle] = 0
+        self._duration[handle] = duration
+        self._active[handle] = 1
+
+        # the callback may have stopped the timer before the flag was set
+        if not self._running:
+            self._running = True
+            self._timer.init(mode=Timer.PERIODIC,
+                             period=self._period,
+                             callback=self._callback)
+
+    def active(self, handle):
+        """Return True if a channel is ramping."""
+        return bool(self._active[handle])
+
+    def written(self, handle, duty):
+        """Account a duty written directly, it stops a ramp."""
+        self._active[handle] = 0
+        self.duties[handle] = duty
+
+    def written_frame(self, handles, duties):
+        """Account duties of a group written directly."""
+        for index in range(len(handles)):
+            handle = handles[index]
+            if handle is not None:
+                self.written(handle, duties[index])
+
+    def _tick(self, _timer):
+        """Timer callback, advance all the ramps by a period."""
+        running = False
+        for handle in range(len(self._active)):
+            if not self._active[handle]:
+                continue
+
+            elapsed = self._elapsed[handle] + self._period
+            duration = self._duration[handle]
+            if elapsed >= duration:
+                duty = self._target[handle]
+                self._active[handle] = 0
+            else:
+                running = True
+                self._elapsed[handle] = elapsed
+                start = self._start[handle]
+                progress = elapsed * SCALE // duration
+                duty = (start + (self._target[handle] - start) * progress
+                        // SCALE)
+
+            if duty != self.duties[handle]:
+                self.duties[handle] = duty
+                self._write(handle, duty)
+
+        if not running:
+            self._running = False
+            self._timer.deinit()
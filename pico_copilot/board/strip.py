@@ -0,0 +1,77 @@
+"""
+Addressable led strips.
+
+A strip is a single preallocated bytearray framebuffer of 3 bytes
+per pixel in the wire color order. Frames of 0..65535 levels are
+written into it through a memoryview, the whole buffer is flushed
+to the driver at most once per tick. A frame shorter than the strip
+is stretched over it, a led group frame lights the whole strip.
+"""
+
+# color component offsets in the wire order
+COLOR_ORDERS = {
+    'RGB': (0, 1, 2),
+    'GRB': (1, 0, 2),
+}
+BYTES_PER_PIXEL = 3
+WHITE = (255, 255, 255)
+
+
+class Strip:
+    """Framebuffer of a strip, driver.write(buffer) sends it out."""
+
+    def __init__(self, pixel_count, driver, color=WHITE, order='GRB'):
+        """Strip initialization, pixels show levels of a color."""
+        self.pixel_count = pixel_count
+        self._driver = driver
+        self.buffer = bytearray(BYTES_PER_PIXEL * pixel_count)
+        # direct access to pixels without copies
+        self.pixels = memoryview(self.buffer)
+        self._color = bytearray(BYTES_PER_PIXEL)
+        for component, offset in enumerate(COLOR_ORDERS[order]):
+            self._color[offset] = color[component]
+        self._dirty = True
+
+    def set_frame(self, levels):
+        """Write 0..65535 levels of pixels into the framebuffer."""
+        count = len(levels)
+        if not count:
+            return
+        pixels = self.pixels
+        pixel_count = self.pixel_count
+        first, second, third = self._color
+        index = 0
+        for pixel in range(pixel_count):
+            # 65535 is scaled to the full color
+            level = levels[pixel * count // pixel_count] + 1
+            pixels[index] = first * level >> 16
+            pixels[index + 1] = second * level >> 16
+            pixels[index + 2] = third * level >> 16
+            index += BYTES_PER_PIXEL
+        self._dirty = True
+
+    def fill(self, level):
+        """Set all pixels to a 0..65535 level."""
+        pixels = self.pixels
+        first, second, third = self._color
+        level += 1
+        first = first * level >> 16
+        second = second * level >> 16
+        third = third * level >> 16
+        for index in range(0, len(pixels), BYTES_PER_PIXEL):
+            pixels[index] = first
+            pixels[index + 1] = second
+            pixels[index + 2] = third
+        self._dirty = True
+
+    def mark_dirty(self):
+        """Flush pixels written directly on the next tick."""
+        self._dirty = True
+
+    def flush(self):
+        """Send the framebuffer if it changed, return True if sent."""
+        if not self._dirty:
+            return False
+        self._driver.write(self.buffer)
+        self._dirty = False
+        return True
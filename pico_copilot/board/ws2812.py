@@ -0,0 +1,18 @@
+"""WS2812 led strip driver."""
+
+from machine import Pin, bitstream
+
+# high and low ns of 0 and 1 bits at 800 kHz
+TIMING = (400, 850, 800, 450)
+
+
+class Ws2812:
+    """Sends strip framebuffers out of a pin."""
+
+    def __init__(self, pin):
+        """Driver initialization."""
+        self._pin = Pin(pin, Pin.OUT)
+
+    def write(self, buffer):
+        """Send a framebuffer, 3 bytes per pixel."""
+        bitstream(self._pin, 0, TIMING, buffer)
@@ -4,75 +4,134 @@ Animations to be used by LEDs.
 Format:
 List of individual led instructions,
 each instruction is a tuple of (seconds, brightness).
+Frames are 0..65535 brightness integers.
 """
 
+from array import array
 from json import loads
 
-from pico_copilot.modules.animations.loader import (
-    Loader,
+from pico_copilot.modules.animations.cache import (
+    ANIMATION_CACHE,
 )
+from pico_copilot.modules.animations.generators import (
+    Generator,
+)
+from pico_copilot.modules.animations.timeline import (
+    Cursor,
+)
+from pico_copilot.utils.clock import MS_IN_SECOND, ticks_diff, ticks_ms
 from pico_copilot.utils.logger import LOG
 
 
 class Animation:
+    """
+    Animation player.
+
+    Frames are sampled against a monotonic clock in milliseconds,
+    a late frame skips ahead instead of slowing the animation down.
+    """
 
-    def __init__(self, animation_name, tick_length):
+    def __init__(self, animation_name, tick_length, clock=ticks_ms,
+                 frame_period=None):
+        """Frames are expected every frame_period ms, a tick by default."""
         self.finished = False
         self._animation_name = animation_name
-        self._animation = None
-        self._transition_scale = 10
+        self._timeline = None
+        self._generator = None
+        self._cursors = []
+        self._frame = array('H')
         self._led_count = 0
         self._tick = tick_length
+        self._frame_period = (frame_period
+                              or round(tick_length * MS_IN_SECOND))
+        self._clock = clock
 
-        self.reset()
+        # frames missed right before the last generated one
+        self.skipped = 0
+        self.skipped_total = 0
 
-    def _advance_time(self):
-        self._time += self._tick
+        self.reset()
 
     def reset(self):
-        self._animation_loader = Loader(self._animation_name, self._tick)
-
-        self._led_count = len(self._animation_loader.animation)
-        self._indexes = [0] * self._led_count
-        self._frame = [led[0] for led in self._animation_loader.animation]
-        self._time = 0
-        self._index_finished = [False] * self._led_count
-        self._led_time = [0.0] * self._led_count
+        """Rewind the animation, the timeline is loaded only once."""
+        if self._timeline is None and self._generator is None:
+            source = ANIMATION_CACHE.get(self._animation_name, self._tick)
+            if isinstance(source, Generator):
+                self._generator = source
+            else:
+                self._timeline = source
+                self._cursors = [Cursor() for _ in range(source.led_count)]
+            self._led_count = source.led_count
+            self._frame = array('H', [0] * self._led_count)
+
+        # called on every repeat, indexes do not allocate
+        cursors = self._cursors
+        for led in range(len(cursors)):
+            # time of the first keyframe is accounted right away
+            cursors[led].reset(self._timeline.start_time(led))
+        # the clock starts with the first frame
+        self._start = None
+        self._last_frame = None
+        self.skipped = 0
         self.finished = False
 
-    def _check_finished(self):
-        self.finished = all(self._index_finished)
+    def _sample_time(self):
+        """Return the animation time and count skipped frames."""
+        now = self._clock()
+        if self._start is None:
+            self._start = now
+        else:
+            missed = (ticks_diff(now, self._last_frame)
+                      // self._frame_period - 1)
+            self.skipped = missed if missed > 0 else 0
+            self.skipped_total += self.skipped
+        self._last_frame = now
+        return ticks_diff(now, self._start)
 
     def generate_frame(self):
         """
-        Generate a consequent led brightness frame.
+        Generate a led brightness frame for the current time.
 
         Should be called every tick.
         """
+        time = self._sample_time()
+        if self._generator is not None:
+            return self._generate_procedural_frame(time)
+
+        timeline = self._timeline
+        finished = True
         for led in range(self._led_count):
-            if self._indexes[led] >= len(
-                    self._animation_loader.animation[led]):  # outof bounds
-                self._index_finished[led] = True
-                self._check_finished()
-            else:
-                led_time, led_brightness = (
-                    self._animation_loader.animation[led][self._indexes[led]])
-                self._frame[led] = led_brightness
-
-                # increment led time per frame
-                self._led_time[led] += led_time
-                # avoid adding the time second time
-                self._animation_loader.animation[led][self._indexes[led]] = (
-                    0.0,
-                    led_brightness)
-
-                if self._time >= self._led_time[led]:
-                    next_index = self._indexes[led] + 1
-                    if next_index < self._animation_loader.length:
-                        self._indexes[led] = next_index
-                    else:
-                        self._index_finished[led] = True
-                        self._check_finished()
-
-        self._advance_time()
+            cursor = self._cursors[led]
+            position = timeline.offsets[led] + cursor.index
+            end = timeline.offsets[led + 1]
+
+            # skip keyframes that are already over
+            while not cursor.finished and time >= cursor.led_time:
+                if position + 1 < end:
+                    cursor.index += 1
+                    position += 1
+                    cursor.led_time += timeline.durations[position]
+                else:
+                    cursor.finished = True
+
+            if position < end:
+                start_time = cursor.led_time - timeline.durations[position]
+                self._frame[led] = timeline.brightness_at(
+                    led, position, time - start_time)
+            else:  # empty row
+                cursor.finished = True
+            finished = finished and cursor.finished
+
+        self.finished = finished
+        return self._frame
+
+    def _generate_procedural_frame(self, time):
+        generator = self._generator
+        if time >= generator.duration:
+            # the last frame is the end of the cycle
+            time = generator.duration
+            self.finished = True
+
+        for led in range(self._led_count):
+            self._frame[led] = generator.brightness(led, time)
         return self._frame
@@ -0,0 +1,89 @@
+"""
+Compiled animations cache.
+
+Timelines are immutable, so they are shared between
+all the animations playing them and survive repeats and mode switches.
+"""
+
+from pico_copilot.modules.animations.loader import (
+    Loader,
+)
+from pico_copilot.utils.logger import LOG
+
+
+class AnimationCache:
+    """LRU cache of compiled animations keyed by (name, tick length)."""
+
+    # 6 bytes per keyframe in a timeline
+    DEFAULT_MAX_KEYFRAMES = 4096
+
+    def __init__(self, max_keyframes=DEFAULT_MAX_KEYFRAMES):
+        """Cache initialization."""
+        self._max_keyframes = max_keyframes
+        self._entries = {}
+        # least recently used first
+        self._order = []
+        self._keyframes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, animation_name, tick_length):
+        """Return a timeline or a generator, loading it on a miss."""
+        key = (animation_name, tick_length)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            if self._order[-1] != key:
+                self._order.remove(key)
+                self._order.append(key)
+            return entry
+
+        self.misses += 1
+        entry = Loader(animation_name, tick_length).source
+        self.put(animation_name, tick_length, entry)
+        return entry
+
+    def put(self, animation_name, tick_length, entry):
+        """Store a timeline or a generator, e.g. preloaded by a tool."""
+        key = (animation_name, tick_length)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._order.remove(key)
+            self._keyframes -= previous.keyframes
+
+        self._entries[key] = entry
+        self._order.append(key)
+        self._keyframes += entry.keyframes
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries exceeding the budget."""
+        # The most recent entry is kept even if it is over the budget alone
+        while self._keyframes > self._max_keyframes and len(self._order) > 1:
+            key = self._order.pop(0)
+            entry = self._entries.pop(key)
+            self._keyframes -= entry.keyframes
+            self.evictions += 1
+            LOG.debug(f'Animation {key[0]} was evicted from the cache')
+
+    def clear(self):
+        """Drop all the entries, keep the counters."""
+        self._entries = {}
+        self._order = []
+        self._keyframes = 0
+
+    def stats(self):
+        """Return cache counters."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'keyframes': self._keyframes,
+            'max_keyframes': self._max_keyframes,
+        }
+
+
+ANIMATION_CACHE = AnimationCache()
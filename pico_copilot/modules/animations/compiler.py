@@ -0,0 +1,147 @@
+"""
+Animations compiler.
+
+Host side tool converting the JSON animations into the compiled format:
+    python3 -m pico_copilot.modules.animations.compiler [--output FILE]
+        [--benchmark]
+Validation, footprint and timing report, non-zero exit code if invalid:
+    python3 -m pico_copilot.modules.animations.compiler --report
+"""
+
+import argparse
+import sys
+import tracemalloc
+from array import array
+from struct import pack
+from time import perf_counter
+
+from pico_copilot.modules.animations.loader import (
+    COMPILED_MAGIC,
+    COMPILED_RESOURCE,
+    COMPILED_VERSION,
+    HEADER_FORMAT,
+    HEADER_SIZE,
+    INDEX_FORMAT,
+    INDEX_SIZE,
+    Loader,
+    read_animations,
+    resource_path,
+    source_checksum,
+)
+from pico_copilot.modules.animations.report import (
+    DEFAULT_MAX_KEYFRAMES,
+    DEFAULT_MAX_RAM,
+    report,
+)
+from pico_copilot.utils.clock import MS_IN_SECOND
+
+# Control module tick
+DEFAULT_TICK_LENGTH = 0.01
+MAX_NAME_LENGTH = 16
+
+
+def block_words(timeline):
+    """Pack a timeline into uint16 words of a compiled block."""
+    words = array('H', [timeline.led_count, timeline.length, timeline.curve])
+    words.extend(timeline.offsets)
+    words.extend(timeline.durations)
+    words.extend(timeline.brightness)
+    return words
+
+
+def compile_animations(tick_length):
+    """Return compiled animations file content."""
+    names = []
+    blocks = []
+    for name in read_animations():
+        if len(name.encode()) > MAX_NAME_LENGTH:
+            raise ValueError(f'Animation name is too long: {name}')
+        timeline = Loader(name, tick_length, compiled=False).timeline
+        # procedural animations are loaded from JSON
+        if timeline is not None:
+            names.append(name)
+            blocks.append(block_words(timeline))
+
+    content = bytearray(pack(HEADER_FORMAT,
+                             COMPILED_MAGIC,
+                             COMPILED_VERSION,
+                             round(tick_length * MS_IN_SECOND),
+                             len(names),
+                             source_checksum()))
+    offset = HEADER_SIZE + INDEX_SIZE * len(names)
+    for name, words in zip(names, blocks):
+        content += pack(INDEX_FORMAT, name.encode(), offset, len(words))
+        offset += len(words) * words.itemsize
+
+    for words in blocks:
+        if sys.byteorder != 'little':
+            words.byteswap()
+        content += words.tobytes()
+
+    return bytes(content)
+
+
+def _measure(load):
+    """Return time in ms, kept and peak heap in bytes of a load call."""
+    tracemalloc.start()
+    start = perf_counter()
+    loader = load()
+    elapsed = (perf_counter() - start) * MS_IN_SECOND
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del loader
+    return elapsed, kept, peak
+
+
+def benchmark(tick_length):
+    """Compare loading time and heap use of both formats."""
+    print(f'{"animation":16} {"format":8} {"ms":>8} {"kept B":>8} '
+          f'{"peak B":>8}')
+    for name in read_animations():
+        for compiled in (False, True):
+            elapsed, kept, peak = _measure(
+                lambda: Loader(name, tick_length, compiled=compiled).source)
+            print(f'{name:16} {"bin" if compiled else "json":8} '
+                  f'{elapsed:8.3f} {kept:8} {peak:8}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tick', type=float, default=DEFAULT_TICK_LENGTH,
+                        help='control module tick length in seconds')
+    parser.add_argument('--output', help='compiled file path, '
+                        'the resources directory by default')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='compare loading of JSON and compiled formats')
+    parser.add_argument('--report', action='store_true',
+                        help='validate animations against the budget '
+                             'instead of compiling')
+    parser.add_argument('--max-keyframes', type=int,
+                        default=DEFAULT_MAX_KEYFRAMES,
+                        help='compiled keyframes budget per animation')
+    parser.add_argument('--max-ram', type=int, default=DEFAULT_MAX_RAM,
+                        help='compact heap budget per animation in bytes')
+    parser.add_argument('--max-frame-us', type=float,
+                        help='host frame render time budget in us')
+    args = parser.parse_args(argv)
+
+    if args.report:
+        valid = report(args.tick,
+                       args.max_keyframes,
+                       args.max_ram,
+                       args.max_frame_us)
+        return 0 if valid else 1
+
+    path = args.output or resource_path(COMPILED_RESOURCE)
+    content = compile_animations(args.tick)
+    with open(path, 'wb') as file:
+        file.write(content)
+    print(f'Compiled {path}: {len(content)} bytes')
+
+    if args.benchmark:
+        benchmark(args.tick)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Layered animations of a led group.
+
+Layers are blended bottom to top into a preallocated frame:
+base, overlay, alert. Every layer keeps playing while covered,
+so removing an overlay reveals the base at its current position.
+Brightness is blended as 0..65535 integers, alpha is fixed point.
+"""
+
+from array import array
+
+from pico_copilot.utils.fixed import MAX_DUTY, SCALE
+
+LAYER_NAMES = ('base', 'overlay', 'alert')
+BASE_LAYER = 0
+
+# replace: opacity blend, max: the brightest wins, add: saturating sum,
+# multiply: the layer dims the ones below, scaled by alpha
+BLEND_MODES = ('replace', 'max', 'add', 'multiply')
+_REPLACE = 0
+_MAX = 1
+_ADD = 2
+
+
+class Layer:
+    """Animation with a blend mode."""
+
+    __slots__ = ('animation', 'repeat', 'blend', 'alpha', 'values', 'cycles')
+
+    def __init__(self, animation, repeat, blend, alpha):
+        """Layer initialization."""
+        self.animation = animation
+        self.repeat = repeat
+        self.blend = BLEND_MODES.index(blend)
+        self.alpha = round(alpha * SCALE)
+        self.values = None
+        self.cycles = 0
+
+    def finished(self):
+        """Return True if the animation is over and is not repeated."""
+        return self.animation.finished and not self.repeat
+
+    def sample(self):
+        """Return the current frame, the last one if finished."""
+        if self.animation.finished:
+            if not self.repeat:
+                return self.values
+            self.animation.reset()
+            self.cycles += 1
+        self.values = self.animation.generate_frame()
+        return self.values
+
+
+class Compositor:
+    """Blends layered animations of a led group into a single frame."""
+
+    def __init__(self, led_count):
+        """Compositor initialization."""
+        self._layers = [None] * len(LAYER_NAMES)
+        # shown where no layer is playing
+        self.background = 0
+        self.frame = array('H', [0] * led_count)
+
+    def set_layer(self, layer, animation, repeat=False, blend='replace',
+                  alpha=1.0):
+        """Play an animation on a layer, replacing the previous one."""
+        self._layers[LAYER_NAMES.index(layer)] = Layer(animation,
+                                                       repeat,
+                                                       blend,
+                                                       alpha)
+
+    def remove_layer(self, layer):
+        """Stop an animation of a layer."""
+        self._layers[LAYER_NAMES.index(layer)] = None
+
+    def clear(self):
+        """Remove all the layers."""
+        for index in range(len(self._layers)):
+            self._layers[index] = None
+
+    def get_layer(self, layer):
+        """Return a layer by name or None."""
+        return self._layers[LAYER_NAMES.index(layer)]
+
+    def has_overlays(self):
+        """Return True if any layer above the base is set."""
+        for index in range(BASE_LAYER + 1, len(self._layers)):
+            if self._layers[index] is not None:
+                return True
+        return False
+
+    def active(self):
+        """Return True if the frame can still change."""
+        base = self._layers[BASE_LAYER]
+        return (self.has_overlays()
+                or (base is not None and not base.finished()))
+
+    def compose(self):
+        """Blend frames of all layers in one pass, return the frame."""
+        frame = self.frame
+        led_count = len(frame)
+        for led in range(led_count):
+            frame[led] = self.background
+
+        for index in range(len(self._layers)):
+            layer = self._layers[index]
+            if layer is None:
+                continue
+            if index != BASE_LAYER and layer.finished():
+                # the last overlay frame was shown on the previous tick
+                self._layers[index] = None
+                continue
+
+            values = layer.sample()
+            if values is None:
+                continue
+
+            blend = layer.blend
+            alpha = layer.alpha
+            for led in range(min(led_count, len(values))):
+                value = values[led]
+                if blend == _REPLACE:
+                    if alpha < SCALE:
+                        value = (frame[led] +
+                                 (value - frame[led]) * alpha // SCALE)
+                    frame[led] = value
+                elif blend == _MAX:
+                    value = value * alpha // SCALE
+                    if value > frame[led]:
+                        frame[led] = value
+                elif blend == _ADD:
+                    frame[led] = min(MAX_DUTY,
+                                     frame[led] + value * alpha // SCALE)
+                else:  # multiply
+                    frame[led] = (frame[led] *
+                                  (SCALE - alpha +
+                                   alpha * value // MAX_DUTY)
+                                  // SCALE)
+
+        return frame
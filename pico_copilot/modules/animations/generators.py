@@ -0,0 +1,150 @@
+"""
+Procedural animations.
+
+Brightness is computed from a led index and time in ms
+with integer arithmetic, no keyframes are stored.
+
+Format:
+JSON animation with a generator name and led count in its config,
+parameters are in seconds and brightness from 0.0 to 1.0.
+"""
+
+from array import array
+from math import cos, pi
+
+from pico_copilot.utils.clock import MS_IN_SECOND
+from pico_copilot.utils.fixed import MAX_DUTY, SCALE
+
+# (1 - cos) / 2 over a half period, the other half is mirrored
+WAVE_STEPS = 128
+WAVE = array('H', [
+    round((1 - cos(pi * step / WAVE_STEPS)) / 2 * MAX_DUTY)
+    for step in range(WAVE_STEPS + 1)
+])
+# fixed point sub steps between wave table entries
+WAVE_FRACTION = 16
+WAVE_PERIOD = 2 * WAVE_STEPS * WAVE_FRACTION
+
+
+def _wave(step):
+    """Return the wave table value of a full period step."""
+    if step > WAVE_STEPS:
+        step = 2 * WAVE_STEPS - step
+    return WAVE[step]
+
+
+def _ms(seconds):
+    return round(seconds * MS_IN_SECOND)
+
+
+def _level(brightness):
+    return round(brightness * MAX_DUTY)
+
+
+class Generator:
+    """
+    Base procedural animation.
+
+    Subclasses define brightness(led, time) returning the brightness
+    of a led at time ms from 0 to MAX_DUTY. Their integer
+    parameters are public, the host renderer vectorizes the same math.
+    """
+
+    # nothing is accounted by the animations cache
+    keyframes = 0
+
+    def __init__(self, led_count, cycle, cycles):
+        """Generator initialization, cycle is in ms."""
+        self.led_count = led_count
+        self.cycle = max(cycle, 1)
+        # the animation is finished after that time
+        self.duration = self.cycle * cycles
+
+
+class Breathe(Generator):
+    """Sine breathing, leds can be shifted in phase."""
+
+    def __init__(self, led_count, period=3.0, low=0.0, high=1.0, shift=0.0,
+                 cycles=1):
+        super().__init__(led_count, _ms(period), cycles)
+        self.low = _level(low)
+        self.range = _level(high) - self.low
+        self.shift = _ms(shift)
+
+    def brightness(self, led, time):
+        time = (time + self.shift * led) % self.cycle
+        phase = time * WAVE_PERIOD // self.cycle
+        step = phase // WAVE_FRACTION
+        fraction = phase % WAVE_FRACTION
+        value = _wave(step)
+        value += (_wave(step + 1) - value) * fraction // WAVE_FRACTION
+        # scaled down to stay within small ints
+        return self.low + self.range * (value >> 4) // (MAX_DUTY >> 4)
+
+
+class Chase(Generator):
+    """Leds are lit one after another, bounce for a knight rider."""
+
+    def __init__(self, led_count, step=0.1, phases=0, on=1.0, off=0.0,
+                 bounce=False, cycles=1):
+        self.phases = phases or led_count
+        self.steps = self.phases
+        if bounce and self.phases > 1:
+            self.steps = 2 * (self.phases - 1)
+        self.step = max(_ms(step), 1)
+        super().__init__(led_count, self.step * self.steps, cycles)
+        self.on = _level(on)
+        self.off = _level(off)
+
+    def brightness(self, led, time):
+        step = time // self.step % self.steps
+        if step >= self.phases:
+            step = self.steps - step
+        if led % self.phases == step:
+            return self.on
+        return self.off
+
+
+class Strobe(Generator):
+    """All leds flash together."""
+
+    def __init__(self, led_count, period=0.1, duty=0.5, on=1.0, off=0.0,
+                 cycles=1):
+        super().__init__(led_count, _ms(period), cycles)
+        self.on_time = round(self.cycle * duty)
+        self.on = _level(on)
+        self.off = _level(off)
+
+    def brightness(self, led, time):
+        if time % self.cycle < self.on_time:
+            return self.on
+        return self.off
+
+
+class Ramp(Generator):
+    """Linear change of all leds, the last value is held afterwards."""
+
+    def __init__(self, led_count, duration=1.0, start=0.0, end=1.0,
+                 cycles=1):
+        super().__init__(led_count, _ms(duration), cycles)
+        self.start = _level(start)
+        self.range = _level(end) - self.start
+
+    def brightness(self, led, time):
+        if time >= self.duration:
+            return self.start + self.range
+        progress = time % self.cycle * SCALE // self.cycle
+        return self.start + self.range * progress // SCALE
+
+
+GENERATORS = {
+    'breathe': Breathe,
+    'chase': Chase,
+    'strobe': Strobe,
+    'ramp': Ramp,
+}
+
+
+def create_generator(name, led_count, params):
+    """Instantiate a registered generator by name."""
+    return GENERATORS[name](led_count, **params)
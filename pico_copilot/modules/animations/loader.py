@@ -3,39 +3,207 @@ Animation loader.
 
 Format:
 JSON with individual LED instructions.
+Transitions are either extended into ticks on load ("extend")
+or interpolated on demand ("interpolation": one of CURVE_NAMES).
+Procedural animations set "generator" and "leds" in the config
+and "params" instead of the data, see the generators module.
+
+Compiled format (little endian, see the compiler module):
+header: magic, version, tick in ms, animations count,
+CRC32 of the JSON it was compiled from
+index: per animation name, block offset in bytes and block size in words
+block (uint16 words): led count, length, curve, led offsets,
+durations in ms, brightness from 0 to MAX_DUTY
 """
 
+from array import array
 from json import loads
+from struct import calcsize, unpack
+
+try:
+    from binascii import crc32
+except ImportError:
+    crc32 = None
 
 import pico_copilot
+from pico_copilot.modules.animations.generators import (
+    create_generator,
+)
+from pico_copilot.modules.animations.timeline import (
+    CURVE_NAMES,
+    MAX_DURATION,
+    Timeline,
+    compile_timeline,
+)
+from pico_copilot.utils.clock import MS_IN_SECOND
 from pico_copilot.utils.logger import LOG
 
+JSON_RESOURCE = 'led_animations.json'
+COMPILED_RESOURCE = 'led_animations.bin'
+
+COMPILED_MAGIC = b'PCAN'
+COMPILED_VERSION = 3
+HEADER_FORMAT = '<4sHHHI'
+INDEX_FORMAT = '<16sII'
+HEADER_SIZE = calcsize(HEADER_FORMAT)
+INDEX_SIZE = calcsize(INDEX_FORMAT)
+BLOCK_HEADER_WORDS = 3
+CHECKSUM_CHUNK = 256
+
+# JSON files do not change while running, checksums are read once
+_checksums = {}
+
+
+def resource_path(filename):
+    """Return a path of a file in the resources directory."""
+    copilot_dir = pico_copilot.__file__
+    copilot_dir = '/'.join(list(copilot_dir.split('/')[0:-1]))
+    return '/'.join([copilot_dir, 'resources', filename])
+
+
+def read_animations():
+    """Parse all the JSON animations."""
+    with open(resource_path(JSON_RESOURCE)) as file:
+        return loads(file.read())
+
+
+def source_checksum(path=None):
+    """Return CRC32 of the JSON animations, None if it is not available."""
+    if crc32 is None:
+        return None
+    path = path or resource_path(JSON_RESOURCE)
+    if path in _checksums:
+        return _checksums[path]
+    try:
+        file = open(path, 'rb')
+    except OSError:
+        # only the compiled animations were deployed
+        return None
+
+    checksum = 0
+    chunk = bytearray(CHECKSUM_CHUNK)
+    with file:
+        size = file.readinto(chunk)
+        while size:
+            checksum = crc32(memoryview(chunk)[:size], checksum)
+            size = file.readinto(chunk)
+    _checksums[path] = checksum
+    return checksum
+
 
 class Loader:
 
-    def __init__(self, animation_name, tick_length):
+    def __init__(self, animation_name, tick_length, compiled=True,
+                 compiled_path=None):
         self.animation = None
+        self.timeline = None
+        self.generator = None
+        # timeline or generator to be played
+        self.source = None
         self.animation_name = animation_name
 
         self._transition_scale = 10
         self.length = 0
+        self.keyframes = 0
         self._tick = tick_length
 
-        self._load_animation()
+        if not (compiled and self._load_compiled(
+                compiled_path or resource_path(COMPILED_RESOURCE))):
+            self._load_animation()
+
+        if self.timeline is not None:
+            self.source = self.timeline
+            self.length = self.timeline.length
+        else:
+            self.source = self.generator
+        self.keyframes = self.source.keyframes
 
     def _load_animation(self):
-        copilot_dir = pico_copilot.__file__
-        copilot_dir = '/'.join(list(copilot_dir.split('/')[0:-1]))
-        resource = '/'.join([copilot_dir, 'resources', 'led_animations.json'])
-        animations = loads(open(resource).read())
+        animations = read_animations()
         animation = animations[self.animation_name]
+        if "generator" in animation["config"]:
+            self.generator = create_generator(
+                animation["config"]["generator"],
+                animation["config"]["leds"],
+                animation.get("params", {}))
+            return
+
         extend = animation["config"]["extend"]
+        interpolation = animation["config"].get("interpolation", 'step')
         self.animation = animation["data"]
 
-        if extend:
+        curve = CURVE_NAMES.index(interpolation)
+        if curve:
+            self._interpolated_animation()
+        elif extend:
             self._extend_animation()
 
-        self._calculate_animation_length()
+        self._check_durations()
+        self.timeline = compile_timeline(self.animation, curve)
+
+    def _check_durations(self):
+        """Raise ValueError if a keyframe does not fit the timeline."""
+        for led, row in enumerate(self.animation):
+            for led_time, _brightness in row:
+                if not 0 <= round(led_time * MS_IN_SECOND) <= MAX_DURATION:
+                    raise ValueError(
+                        f'Animation {self.animation_name}: led {led} '
+                        f'keyframe of {led_time} s is out of '
+                        f'0-{MAX_DURATION} ms')
+
+    def _load_compiled(self, path):
+        """Load a precompiled animation, return False if not available."""
+        try:
+            file = open(path, 'rb')
+        except OSError:
+            return False
+
+        with file:
+            magic, version, tick_ms, count, checksum = unpack(
+                HEADER_FORMAT, file.read(HEADER_SIZE))
+            if magic != COMPILED_MAGIC or version != COMPILED_VERSION:
+                LOG.warning('Compiled animations format is not supported')
+                return False
+            source = source_checksum()
+            if source is not None and source != checksum:
+                LOG.warning('Compiled animations are stale, '
+                            'loading the JSON ones')
+                return False
+            # transitions are extended with the tick length
+            if tick_ms != round(self._tick * MS_IN_SECOND):
+                return False
+
+            name = self.animation_name.encode()
+            for _ in range(count):
+                entry_name, offset, words = unpack(INDEX_FORMAT,
+                                                   file.read(INDEX_SIZE))
+                if entry_name.rstrip(b'\0') == name:
+                    break
+            else:
+                return False
+
+            # allocated once and filled in place, no temporary bytes
+            block = array('H', [0]) * words
+            file.seek(offset)
+            file.readinto(memoryview(block))
+
+        self.timeline = timeline_from_block(block)
+        return True
+
+    def _interpolated_animation(self):
+        """Lay out keyframes the way extended transitions are played."""
+        # Every transition except the last one is followed
+        # by holding its brightness, it is a transition to the same value
+        interpolated_animation = []
+        for row in self.animation:
+            interpolated_row = [row[0]]
+            for keyframe in row[1:-1]:
+                interpolated_row.extend((keyframe, keyframe))
+            if len(row) > 1:
+                interpolated_row.append(row[-1])
+            interpolated_animation.append(interpolated_row)
+
+        self.animation = interpolated_animation
 
     def _extend_animation(self):
         tick = self._tick * self._transition_scale
@@ -72,6 +240,9 @@ class Loader:
         self.animation = extended_animation
 
     def _generate_values_between(self, a, b, ticks):
+        if ticks < 2:
+            # transition is shorter than an extended tick
+            return
         step = (b - a) / (ticks)
         value = a + step
         # print(f'a = {a}')
@@ -82,6 +253,21 @@ class Loader:
             yield value
             value += step
 
-    def _calculate_animation_length(self):
-        list_of_lengths = [len(sublist) for sublist in self.animation]
-        self.length = max(list_of_lengths)
+
+def timeline_from_block(block):
+    """Create a timeline over a compiled block without copying it."""
+    view = memoryview(block)
+    led_count = view[0]
+    length = view[1]
+    curve = view[2]
+
+    start = BLOCK_HEADER_WORDS
+    offsets = view[start:start + led_count + 1]
+    keyframes = offsets[led_count]
+
+    start += led_count + 1
+    durations = view[start:start + keyframes]
+    start += keyframes
+    brightness = view[start:start + keyframes]
+
+    return Timeline(durations, brightness, offsets, length, curve)
@@ -0,0 +1,219 @@
+"""
+Timeline renderer.
+
+Host side only, NumPy is not available on the Pico.
+Renders whole animations into (leds x ticks) uint16 brightness arrays
+with the same integer math as the playback of Animation on time,
+columns are equal to the played frames:
+    python3 -m pico_copilot.modules.animations.renderer NAME
+        [--ticks N] [--once] [--save FILE.npy] [--compare FILE.npy]
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from pico_copilot.modules.animations.generators import (
+    WAVE,
+    WAVE_FRACTION,
+    WAVE_PERIOD,
+    WAVE_STEPS,
+    Breathe,
+    Chase,
+    Ramp,
+    Strobe,
+)
+from pico_copilot.modules.animations.loader import Loader
+from pico_copilot.modules.animations.timeline import CURVES
+from pico_copilot.utils.clock import MS_IN_SECOND
+from pico_copilot.utils.fixed import MAX_DUTY, SCALE
+
+DEFAULT_TICK_LENGTH = 0.01
+
+
+def _cycle_times(duration, tick_ms):
+    """Return frame times of a cycle, the last frame finishes it."""
+    frames = -(-duration // tick_ms) + 1
+    return np.arange(frames, dtype=np.int64) * tick_ms
+
+
+def render_timeline(timeline, tick_ms):
+    """Render a single cycle of a timeline."""
+    offsets = np.asarray(timeline.offsets, dtype=np.int64)
+    durations = np.asarray(timeline.durations, dtype=np.int64)
+    brightness = np.asarray(timeline.brightness, dtype=np.int64)
+
+    ends = [durations[offsets[led]:offsets[led + 1]].sum()
+            for led in range(timeline.led_count)]
+    times = _cycle_times(int(max(ends, default=0)), tick_ms)
+    frames = np.zeros((timeline.led_count, len(times)), dtype=np.int64)
+
+    for led in range(timeline.led_count):
+        start, end = offsets[led], offsets[led + 1]
+        if start == end:
+            continue
+        row_durations = durations[start:end]
+        row_brightness = brightness[start:end]
+        row_ends = np.cumsum(row_durations)
+
+        # keyframes which are over are skipped, the last one is held
+        index = np.minimum(np.searchsorted(row_ends, times, side='right'),
+                           end - start - 1)
+        values = row_brightness[index]
+
+        if timeline.curve:
+            duration = row_durations[index]
+            elapsed = times - (row_ends[index] - duration)
+            transition = (index > 0) & (elapsed < duration)
+            previous = row_brightness[np.maximum(index - 1, 0)]
+            progress = CURVES[timeline.curve](
+                elapsed * SCALE // np.maximum(duration, 1))
+            interpolated = (previous +
+                            (values - previous) * progress // SCALE)
+            values = np.where(transition, interpolated, values)
+
+        frames[led] = values
+
+    return frames
+
+
+def _render_breathe(generator, leds, times):
+    phase_time = (times + generator.shift * leds) % generator.cycle
+    phase = phase_time * WAVE_PERIOD // generator.cycle
+    step = phase // WAVE_FRACTION
+    fraction = phase % WAVE_FRACTION
+    wave = np.asarray(WAVE, dtype=np.int64)
+
+    def mirrored(steps):
+        return wave[np.where(steps > WAVE_STEPS,
+                             2 * WAVE_STEPS - steps,
+                             steps)]
+
+    value = mirrored(step)
+    value += (mirrored(step + 1) - value) * fraction // WAVE_FRACTION
+    return (generator.low +
+            generator.range * (value >> 4) // (MAX_DUTY >> 4))
+
+
+def _render_chase(generator, leds, times):
+    step = times // generator.step % generator.steps
+    step = np.where(step >= generator.phases, generator.steps - step, step)
+    return np.where(leds % generator.phases == step,
+                    generator.on,
+                    generator.off)
+
+
+def _render_strobe(generator, leds, times):
+    return np.where(times % generator.cycle < generator.on_time,
+                    generator.on,
+                    generator.off)
+
+
+def _render_ramp(generator, leds, times):
+    progress = times % generator.cycle * SCALE // generator.cycle
+    values = generator.start + generator.range * progress // SCALE
+    return np.where(times >= generator.duration,
+                    generator.start + generator.range,
+                    values)
+
+
+_GENERATOR_RENDERERS = {
+    Breathe: _render_breathe,
+    Chase: _render_chase,
+    Strobe: _render_strobe,
+    Ramp: _render_ramp,
+}
+
+
+def render_generator(generator, tick_ms):
+    """Render a single cycle of a procedural animation."""
+    # time stops at the end of the last cycle
+    times = np.minimum(_cycle_times(generator.duration, tick_ms),
+                       generator.duration)
+    leds = np.arange(generator.led_count, dtype=np.int64)[:, np.newaxis]
+    frames = _GENERATOR_RENDERERS[type(generator)](generator, leds, times)
+    # leds of some generators are all the same
+    return np.broadcast_to(frames, (generator.led_count, len(times)))
+
+
+def render(animation_name, tick_length=DEFAULT_TICK_LENGTH, ticks=None,
+           repeat=True, compiled=False):
+    """
+    Render an animation into a (leds x ticks) uint16 array.
+
+    A repeated animation restarts right after its finishing frame,
+    otherwise the last frame is held. A single cycle by default.
+    """
+    tick_ms = round(tick_length * MS_IN_SECOND)
+    loader = Loader(animation_name, tick_length, compiled=compiled)
+    if loader.timeline is not None:
+        cycle = render_timeline(loader.timeline, tick_ms)
+    else:
+        cycle = render_generator(loader.generator, tick_ms)
+
+    cycle = cycle.astype(np.uint16)
+    if ticks is None:
+        return cycle
+
+    cycle_ticks = cycle.shape[1]
+    if repeat:
+        return np.tile(cycle, -(-ticks // cycle_ticks))[:, :ticks]
+    if ticks <= cycle_ticks:
+        return cycle[:, :ticks]
+    hold = np.repeat(cycle[:, -1:], ticks - cycle_ticks, axis=1)
+    return np.concatenate((cycle, hold), axis=1)
+
+
+def energy(frames, tick_length=DEFAULT_TICK_LENGTH):
+    """Return full brightness seconds of every led."""
+    return frames.sum(axis=1, dtype=np.int64) / MAX_DUTY * tick_length
+
+
+def compare(frames, golden):
+    """Return (led, tick) of the first difference or None."""
+    if frames.shape != golden.shape:
+        raise ValueError(f'Shape {frames.shape} differs from '
+                         f'{golden.shape}')
+    differences = np.argwhere(frames != golden)
+    if len(differences):
+        return tuple(int(value) for value in differences[0])
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('name', help='animation name')
+    parser.add_argument('--tick', type=float, default=DEFAULT_TICK_LENGTH,
+                        help='control module tick length in seconds')
+    parser.add_argument('--ticks', type=int, help='frames to render')
+    parser.add_argument('--once', action='store_true',
+                        help='hold the last frame instead of repeating')
+    parser.add_argument('--compiled', action='store_true',
+                        help='render the compiled animation')
+    parser.add_argument('--save', help='save frames as a golden file')
+    parser.add_argument('--compare', help='compare frames to a golden file')
+    args = parser.parse_args(argv)
+
+    frames = render(args.name, args.tick, args.ticks, not args.once,
+                    args.compiled)
+    print(f'{args.name}: {frames.shape[0]} leds x {frames.shape[1]} ticks')
+    for led, seconds in enumerate(energy(frames, args.tick)):
+        print(f'led {led}: {seconds:.3f} s at full brightness')
+
+    if args.save:
+        np.save(args.save, frames)
+        print(f'Saved {args.save}')
+
+    if args.compare:
+        difference = compare(frames, np.load(args.compare))
+        if difference:
+            print(f'Differs from {args.compare} at led {difference[0]}, '
+                  f'tick {difference[1]}')
+            return 1
+        print(f'Matches {args.compare}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
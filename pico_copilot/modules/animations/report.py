@@ -0,0 +1,187 @@
+"""
+Animations report.
+
+Host side validation, footprint and timing of the JSON animations:
+    python3 -m pico_copilot.modules.animations.compiler --report
+
+Heap sizes are MicroPython estimates: 16 byte GC blocks,
+4 byte pointers and boxed floats.
+"""
+
+from time import perf_counter
+
+from pico_copilot.modules.animations.animation import Animation
+from pico_copilot.modules.animations.cache import ANIMATION_CACHE
+from pico_copilot.modules.animations.loader import (
+    Loader,
+    read_animations,
+)
+from pico_copilot.modules.animations.timeline import (
+    CURVE_NAMES,
+    MAX_DURATION,
+    Timeline,
+)
+from pico_copilot.utils.clock import MS_IN_SECOND
+
+GC_BLOCK = 16
+POINTER = 4
+OBJECT_HEADER = 16
+FLOAT = 16
+
+DEFAULT_MAX_KEYFRAMES = 512
+DEFAULT_MAX_RAM = 4096
+
+
+def _heap(size):
+    """Round a size up to whole GC blocks."""
+    return (size + GC_BLOCK - 1) // GC_BLOCK * GC_BLOCK
+
+
+def list_ram(rows):
+    """Estimate heap of rows of [seconds, brightness] lists."""
+    size = _heap(OBJECT_HEADER) + _heap(POINTER * len(rows))
+    keyframe = _heap(OBJECT_HEADER) + _heap(2 * POINTER) + 2 * FLOAT
+    for row in rows:
+        size += _heap(OBJECT_HEADER) + _heap(POINTER * len(row))
+        size += keyframe * len(row)
+    return size
+
+
+def compact_ram(timeline):
+    """Estimate heap of a timeline with uint16 columns."""
+    size = _heap(OBJECT_HEADER + POINTER * len(Timeline.__slots__))
+    for column in (timeline.durations, timeline.brightness,
+                   timeline.offsets):
+        size += _heap(OBJECT_HEADER) + _heap(2 * len(column))
+    return size
+
+
+def led_durations(timeline):
+    """Return total ms of every led."""
+    return [
+        sum(timeline.durations[timeline.offsets[led]:
+                               timeline.offsets[led + 1]])
+        for led in range(timeline.led_count)
+    ]
+
+
+def frame_cost(name, tick_length, source, duration):
+    """Return average us of a frame over a whole animation."""
+    # played from the checked source even if the compiled one differs
+    ANIMATION_CACHE.put(name, tick_length, source)
+    now = [0]
+    animation = Animation(name, tick_length, lambda: now[0])
+    tick_ms = round(tick_length * MS_IN_SECOND)
+    frames = duration // tick_ms + 1
+
+    start = perf_counter()
+    for frame in range(frames):
+        now[0] = frame * tick_ms
+        animation.generate_frame()
+    return (perf_counter() - start) * MS_IN_SECOND ** 2 / frames
+
+
+def _validate_rows(rows):
+    """Return errors and warnings of authored keyframes."""
+    errors = []
+    warnings = []
+    for led, row in enumerate(rows):
+        if not row:
+            errors.append(f'led {led} has no keyframes')
+        for led_time, brightness in row:
+            if not 0.0 <= brightness <= 1.0:
+                errors.append(f'led {led} brightness {brightness}')
+            if not 0 <= round(led_time * MS_IN_SECOND) <= MAX_DURATION:
+                errors.append(f'led {led} duration {led_time}')
+
+    lengths = sorted({len(row) for row in rows})
+    if len(lengths) > 1:
+        warnings.append(f'rows have {lengths[0]}-{lengths[-1]} keyframes')
+    return errors, warnings
+
+
+def analyze(name, animation, tick_length):
+    """Return a report entry of a JSON animation."""
+    entry = {
+        'name': name,
+        'kind': '',
+        'leds': 0,
+        'authored': 0,
+        'compiled': 0,
+        'list_ram': 0,
+        'compact_ram': 0,
+        'durations': [],
+        'frame_us': 0.0,
+        'errors': [],
+        'warnings': [],
+    }
+    try:
+        loader = Loader(name, tick_length, compiled=False)
+        if loader.timeline is None:
+            source = loader.generator
+            entry['kind'] = animation['config']['generator']
+            entry['durations'] = [source.duration] * source.led_count
+        else:
+            source = loader.timeline
+            if animation['config']['extend'] and not source.curve:
+                entry['kind'] = 'extend'
+            else:
+                entry['kind'] = CURVE_NAMES[source.curve]
+            errors, warnings = _validate_rows(animation['data'])
+            entry['errors'] += errors
+            entry['warnings'] += warnings
+            entry['authored'] = sum(len(row) for row in animation['data'])
+            entry['compiled'] = source.keyframes
+            entry['list_ram'] = list_ram(loader.animation)
+            entry['compact_ram'] = compact_ram(source)
+            entry['durations'] = led_durations(source)
+    except (KeyError, ValueError, TypeError) as error:
+        entry['errors'].append(f'can not be loaded: {error!r}')
+        return entry
+
+    entry['leds'] = source.led_count
+    if not entry['errors']:
+        entry['frame_us'] = frame_cost(name, tick_length, source,
+                                       max(entry['durations'], default=0))
+    return entry
+
+
+def _check_budget(entry, max_keyframes, max_ram, max_frame_us):
+    if entry['compiled'] > max_keyframes:
+        entry['errors'].append(f'{entry["compiled"]} keyframes '
+                               f'> {max_keyframes}')
+    if entry['compact_ram'] > max_ram:
+        entry['errors'].append(f'{entry["compact_ram"]} B > {max_ram} B')
+    if max_frame_us and entry['frame_us'] > max_frame_us:
+        entry['errors'].append(f'{entry["frame_us"]:.1f} us '
+                               f'> {max_frame_us} us')
+
+
+def report(tick_length, max_keyframes=DEFAULT_MAX_KEYFRAMES,
+           max_ram=DEFAULT_MAX_RAM, max_frame_us=None):
+    """Print the report, return False if any animation is not valid."""
+    print(f'{"animation":16} {"kind":12} {"leds":>4} {"kf":>5} '
+          f'{"kf ext":>6} {"list B":>7} {"array B":>7} {"ms per led":>20} '
+          f'{"us/frame":>8}')
+    valid = True
+    for name, animation in read_animations().items():
+        entry = analyze(name, animation, tick_length)
+        _check_budget(entry, max_keyframes, max_ram, max_frame_us)
+
+        durations = entry['durations']
+        if durations and min(durations) != max(durations):
+            durations = f'{min(durations)}-{max(durations)}'
+        else:
+            durations = str(max(durations, default=0))
+        print(f'{name:16} {entry["kind"]:12} {entry["leds"]:4} '
+              f'{entry["authored"]:5} {entry["compiled"]:6} '
+              f'{entry["list_ram"]:7} {entry["compact_ram"]:7} '
+              f'{durations:>20} {entry["frame_us"]:8.1f}')
+
+        for warning in entry['warnings']:
+            print(f'    warning: {warning}')
+        for error in entry['errors']:
+            print(f'    error: {error}')
+        valid = valid and not entry['errors']
+
+    return valid
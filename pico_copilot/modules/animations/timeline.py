@@ -0,0 +1,120 @@
+"""
+Compiled animation timeline.
+
+Format:
+Keyframes of all the leds are stored back to back in flat columns,
+offsets point to the first keyframe of every led.
+Durations are in milliseconds, brightness is from 0 to MAX_DUTY.
+
+With an interpolation curve every keyframe except the first one
+in a row is a transition from the previous brightness,
+the brightness between keyframes is computed on demand.
+"""
+
+from array import array
+
+from pico_copilot.utils.clock import MS_IN_SECOND
+from pico_copilot.utils.fixed import MAX_DUTY, SCALE
+
+# keyframe durations are uint16 ms
+MAX_DURATION = 65535
+
+
+def _linear(progress):
+    return progress
+
+
+def _ease_in(progress):
+    return progress * progress // SCALE
+
+
+def _ease_out(progress):
+    rest = SCALE - progress
+    return SCALE - rest * rest // SCALE
+
+
+def _ease_in_out(progress):
+    # smoothstep, the square keeps 4 more bits so that the curve does not
+    # step back while it is flat, products stay within small ints
+    square = progress * progress >> 4
+    return (square * (3 * SCALE - 2 * progress)
+            // (SCALE * SCALE >> 4))
+
+
+# index is stored in a compiled timeline, 0 is no interpolation
+CURVE_NAMES = ('step', 'linear', 'ease_in', 'ease_out', 'ease_in_out')
+CURVES = (None, _linear, _ease_in, _ease_out, _ease_in_out)
+
+
+class Timeline:
+    """Immutable keyframes of an animation, shared between players."""
+
+    __slots__ = ('durations', 'brightness', 'offsets', 'length', 'curve',
+                 'led_count', 'keyframes')
+
+    def __init__(self, durations, brightness, offsets, length, curve=0):
+        """Wrap keyframe columns, arrays or memoryviews of uint16."""
+        self.durations = durations
+        self.brightness = brightness
+        self.offsets = offsets
+        self.length = length
+        self.curve = curve
+
+        self.led_count = len(offsets) - 1
+        self.keyframes = len(durations)
+
+    def start_time(self, led):
+        """Return the duration of the first led keyframe."""
+        start = self.offsets[led]
+        if start < self.offsets[led + 1]:
+            return self.durations[start]
+        return 0
+
+    def brightness_at(self, led, position, elapsed):
+        """Return keyframe brightness after elapsed ms of it."""
+        target = self.brightness[position]
+        if not self.curve or position == self.offsets[led]:
+            return target
+
+        duration = self.durations[position]
+        if elapsed >= duration:
+            return target
+
+        previous = self.brightness[position - 1]
+        progress = CURVES[self.curve](elapsed * SCALE // duration)
+        return previous + (target - previous) * progress // SCALE
+
+
+def compile_timeline(rows, curve=0):
+    """Compile rows of (seconds, brightness) keyframes."""
+    durations = array('H')
+    brightness = array('H')
+    offsets = array('H', [0])
+    length = 0
+
+    for row in rows:
+        for led_time, led_brightness in row:
+            durations.append(round(led_time * MS_IN_SECOND))
+            brightness.append(round(led_brightness * MAX_DUTY))
+        offsets.append(len(durations))
+        length = max(length, len(row))
+
+    return Timeline(durations, brightness, offsets, length, curve)
+
+
+class Cursor:
+    """Playback position of a single led within a timeline."""
+
+    __slots__ = ('index', 'led_time', 'finished')
+
+    def __init__(self):
+        """Cursor initialization."""
+        self.index = 0
+        self.led_time = 0
+        self.finished = False
+
+    def reset(self, led_time):
+        """Rewind to the first keyframe."""
+        self.index = 0
+        self.led_time = led_time
+        self.finished = False
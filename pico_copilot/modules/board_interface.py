@@ -3,7 +3,7 @@
 
 class BoardInterface:
     """Interface between an emulator window and a control module."""
-    DEFAULT_BRIGHTNESS = 0.0
+    DEFAULT_DUTY = 0
 
     def __init__(self, board, config):
         """Board initialization."""
@@ -11,13 +11,51 @@ class BoardInterface:
 
         for _set_name, set_params in config['leds'].items():
             for name, _params in set_params['leds'].items():
-                self._board.set_led_brightness(
-                    name, self.DEFAULT_BRIGHTNESS)
+                handle = self._board.get_led_handle(name)
+                if handle is not None:
+                    self._board.set_led_duty(handle, self.DEFAULT_DUTY)
 
-    def change_brightness(self, name, brightness):
-        """Change brightness for a led element in the window."""
-        # LOG.debug(f' Board IF: {name} brightness: {brightness}')
-        self._board.set_led_brightness(name, brightness)
+        # strips showing the frames of led groups
+        self._group_strips = {}
+        for name, params in config.get('strips', {}).items():
+            if 'group' in params:
+                self._group_strips[params['group']] = name
+
+    def get_led_handle(self, name):
+        """Resolve a led name once, writes are done by its handle."""
+        return self._board.get_led_handle(name)
+
+    def add_led_group(self, handles):
+        """Resolve a led group once, frames are written by its handle."""
+        return self._board.add_led_group(handles)
+
+    def get_strip_handle(self, name):
+        """Resolve a strip once, frames are written by its handle."""
+        return self._board.get_strip_handle(name)
+
+    def get_group_strip(self, led_type):
+        """Return a handle of a strip showing a led group or None."""
+        name = self._group_strips.get(led_type)
+        if name is None:
+            return None
+        return self._board.get_strip_handle(name)
+
+    def set_frame(self, group_handle, duties):
+        """Change 0..65535 duties of all leds of a group at once."""
+        self._board.set_frame(group_handle, duties)
+
+    def flush(self):
+        """Send buffered frames out, once per tick."""
+        self._board.flush()
+
+    def change_duty(self, handle, duty):
+        """Change a 0..65535 duty of a led."""
+        # LOG.debug(f' Board IF: {handle} duty: {duty}')
+        self._board.set_led_duty(handle, duty)
+
+    def ramp_duty(self, handle, duty, duration):
+        """Ramp a led to a 0..65535 duty in ms, run by the board."""
+        self._board.ramp_led_duty(handle, duty, duration)
 
     def get_light_sensor(self):
         """Get the value of a light sensor slider in the window."""
@@ -25,3 +63,11 @@ class BoardInterface:
 
     def get_button_state(self):
         return self._board.get_button_state()
+
+    def set_button_handler(self, handler):
+        """Call handler(pin) on button edges."""
+        self._board.set_button_handler(handler)
+
+    def get_button_edges(self):
+        """Return the buffer of timestamped button edges."""
+        return self._board.get_button_edges()
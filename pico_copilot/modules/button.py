@@ -1,118 +1,107 @@
 """Led module."""
 
-import asyncio
-
+from pico_copilot.utils.clock import MS_IN_SECOND, ticks_diff, ticks_ms
 from pico_copilot.utils.logger import LOG
 
 
 class ButtonModule:
     """Button Module."""
 
-    DELAY_BETWEEN_CLICKS_MIN = 0.01
-    DELAY_BETWEEN_CLICKS_MAX = 0.2
-    DELAY_LONG_CLICK = 2.0
-    CLICK_MIN_DURATION = 0.01
+    # ms between edge timestamps
+    DELAY_BETWEEN_CLICKS_MAX = 200
+    DELAY_LONG_CLICK = 2000
+    CLICK_MIN_DURATION = 10
 
-    def __init__(self, board, state, name, tick_length):
+    def __init__(self, board, state, name, tick_length, clock=ticks_ms):
         """Leds initialization."""
         self._board = board
         self._state = state
         self._name = name
-        self._tick = tick_length
+        # clicks are timed by edges, the clock only ends waiting
+        self._clock = clock
+        self.period = round(tick_length * MS_IN_SECOND)
+        self._edges = board.get_button_edges()
+        # edges dropped by a full buffer, e.g. while bouncing
+        self._dropped = self._edges.dropped
 
         self._pressed = False
-        self._pressed_ticks = 0
-        self._unpressed_ticks = 0
-
-        self._previous_click = False
-        self._just_released = False
-        self._double_click_possible = False
-        self._delay_ticks = 0
+        self._pressed_time = 0
+        self._released_time = 0
 
+        # a click waits for a possible double click
+        self._click_pending = False
         self._long_click_possible = False
-        self._single_click_possible = False
-        self._click_handled = False
 
-        # Always hardcoded
+        # set by button edges, the first update is right away
         self.updates_available = True
 
-    async def update(self):
-        button_pressed = self._board.get_button_state()
-        self._check_button(button_pressed)
-
-    def _check_button(self, event_pressed=True):
-        if event_pressed:
-            if self._pressed:
-                # LOG.debug('Button kept pressed')
-                self._pressed_ticks += 1
-
-                # The only event handled before button release
-                if self._is_long_click() and self._long_click_possible:
-                    self._add_event('long_click')
-                    self._long_click_possible = False
-                    self._click_handled = True
-            else:
-                if self._just_released:
-                    # LOG.debug('Button pressed second time')
-                    self._double_click_possible = True
-                else:
-                    # LOG.debug('Button pressed first time')
-                    self._long_click_possible = True
-
-                self._pressed = True
-                self._pressed_ticks = 1
-                self._click_handled = False
+    def update(self):
+        edge = self._edges.pop()
+        while edge is not None:
+            self._handle_edge(*edge)
+            edge = self._edges.pop()
+        now = self._clock()
+        if self._edges.dropped != self._dropped:
+            self._dropped = self._edges.dropped
+            self._resync(now)
+        self._check_timeouts(now)
+        # updated again while a click is in progress or after an edge
+        self.updates_available = self._pressed or self._click_pending
+
+    def _handle_edge(self, time, pressed):
+        """Classify an edge by its timestamp."""
+        if pressed == self._pressed:
+            # LOG.debug('Repeated edge, ignoring')
+            return
+        # waiting ended at the edge, not at the time it is handled
+        self._check_timeouts(time)
+        self._pressed = pressed
+
+        if pressed:
+            self._pressed_time = time
+            self._long_click_possible = True
+        elif not self._long_click_possible:
+            # LOG.debug('Long click released')
+            pass
+        elif ticks_diff(time, self._pressed_time) < self.CLICK_MIN_DURATION:
+            # LOG.debug('Click too short, ignoring')
+            pass
+        elif self._click_pending:
+            self._add_event('double_click')
+            self._click_pending = False
         else:
-            if self._pressed:
-                # LOG.debug('Button released')
-
-                # Double click is handled on release
-                if self._is_click():
-                    if self._double_click_possible:
-                        self._add_event('double_click')
-                        self._click_handled = True
-                        self._double_click_possible = False
-                        self._just_released = False
-                    # Single click is handled after a delay
-                    # to be able to process a double click
-
-                    self._pressed = False
-
-                    self._just_released = True
-                    self._delay_ticks = 1
-                else:
-                    # LOG.debug('Click too short, ignoring')
-                    self._click_handled = True
-
-            else:
-                # LOG.debug('Button kept unpressed')
-
-                # Need to keep track of delay in case of double click
-                if self._just_released:
-                    self._delay_ticks += 1
-
-                    if not self._is_double_click_delay():
-                        self._just_released = False
-
-                        if not self._click_handled and self._is_click():
-                            self._add_event('single_click')
-                            self._click_handled = True
-                            self._pressed_ticks = 0
-
-    def _pressed_time(self, time):
-        return time * self._tick
-
-    def _is_double_click_delay(self):
-        return self._pressed_time(
-            self._delay_ticks) <= self.DELAY_BETWEEN_CLICKS_MAX
-
-    def _is_click(self):
-        return self._pressed_time(
-            self._pressed_ticks) >= self.CLICK_MIN_DURATION
-
-    def _is_long_click(self):
-        pressed_time = self._pressed_ticks * self._tick
-        return pressed_time >= self.DELAY_LONG_CLICK
+            # Single click is handled after a delay
+            # to be able to process a double click
+            self._click_pending = True
+            self._released_time = time
+
+    def _resync(self, now):
+        """Take the pin state after lost edges, no click is reported."""
+        pressed = self._board.get_button_state()
+        LOG.warning(f'Button edges were dropped, pressed: {pressed}')
+        if pressed == self._pressed:
+            return
+        self._pressed = pressed
+        self._click_pending = False
+        # a long click is timed from now if the button stays pressed
+        self._long_click_possible = pressed
+        self._pressed_time = now
+
+    def _check_timeouts(self, now):
+        """Handle clicks which are decided by time passing until now."""
+        if self._pressed:
+            # The only event handled before button release
+            if (self._long_click_possible
+                    and ticks_diff(now, self._pressed_time)
+                    >= self.DELAY_LONG_CLICK):
+                self._add_event('long_click')
+                self._long_click_possible = False
+                self._click_pending = False
+        elif (self._click_pending
+              and ticks_diff(now, self._released_time)
+              > self.DELAY_BETWEEN_CLICKS_MAX):
+            self._add_event('single_click')
+            self._click_pending = False
 
     def _add_event(self, event):
         LOG.info(f'Got event: {event}')
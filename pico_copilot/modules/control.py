@@ -1,8 +1,12 @@
 """Control module."""
 
-import asyncio
-
 from pico_copilot.modules.led import LedManager
+from pico_copilot.modules.led_core import (
+    Commands,
+    CoreState,
+    LedCore,
+    RemoteLeds,
+)
 from pico_copilot.modules.sensor import SensorManager
 from pico_copilot.modules.power import PowerModule
 from pico_copilot.modules.board_interface import BoardInterface
@@ -13,17 +17,45 @@ from pico_copilot.modules.modes import (
     StaticMode,
     NormalMode,
 )
-from pico_copilot.modules.state import State
+from pico_copilot.modules.state import (
+    ANIMATION_FINISHED,
+    BUTTON_EVENTS,
+    SENSOR,
+    State,
+)
+from pico_copilot.utils.clock import (
+    MS_IN_SECOND,
+    sleep_ms,
+    ticks_add,
+    ticks_diff,
+    ticks_ms,
+    ticks_us,
+)
+from pico_copilot.utils.flag import ThreadSafeFlag, wait_ms
 from pico_copilot.utils.logger import LOG
+from pico_copilot.utils.profiler import Timing
 
 
 class ControlModule:
     """Module to control launch of all other modules."""
 
-    def __init__(self, board, state):
-        """All modules initialization."""
+    # the status heartbeat does not need every tick
+    STATUS_LEDS_PERIOD = 40
+    # timings are logged and reset this often, in ms
+    TIMINGS_LOG_PERIOD = 60000
+
+    def __init__(self, board, state, clock=ticks_ms, sleep=sleep_ms,
+                 dual_core=False):
+        """All modules initialization, leds can run on the second core."""
         # event handling speed
         self._tick = 0.01
+        self._tick_ms = round(self._tick * MS_IN_SECOND)
+        # monotonic milliseconds, animations are sampled against it
+        self._clock = clock
+        # sleeps between ticks, async and in ms
+        self._sleep = sleep
+        # set by button edges and external events to leave idle
+        self._wakeup = ThreadSafeFlag()
         self._board = board
         self._state = State(state)
         self._mode = None
@@ -36,19 +68,30 @@ class ControlModule:
             'normal': self._set_normal_mode,
         }
 
+        # led modules on the led core change the state through core 0
+        led_state = self._state
+        self._led_results = None
+        if dual_core:
+            self._led_results = Commands()
+            led_state = CoreState(self._state, self._led_results)
+
         self._modules = {}
         self._modules['tail_leds'] = LedManager(self._board,
-                                                self._state,
+                                                led_state,
                                                 'tail',
-                                                self._tick)
+                                                self._tick,
+                                                self._clock)
         self._modules['front_leds'] = LedManager(self._board,
-                                                 self._state,
+                                                 led_state,
                                                  'front',
-                                                 self._tick)
+                                                 self._tick,
+                                                 self._clock)
         self._modules['status_leds'] = LedManager(self._board,
-                                                  self._state,
+                                                  led_state,
                                                   'status',
-                                                  self._tick)
+                                                  self._tick,
+                                                  self._clock,
+                                                  self.STATUS_LEDS_PERIOD)
         self._modules['sensors'] = SensorManager(self._board,
                                                  self._state,
                                                  'light',
@@ -56,30 +99,195 @@ class ControlModule:
         self._modules['button1'] = ButtonModule(self._board,
                                                 self._state,
                                                 'button1',
-                                                self._tick)
+                                                self._tick,
+                                                self._clock)
+
+        self._led_modules = (self._modules['tail_leds'],
+                             self._modules['front_leds'],
+                             self._modules['status_leds'])
+        self._led_core = None
+        if dual_core:
+            # frames are rendered and written by the second core
+            self._led_core = LedCore(self._led_modules,
+                                     self._board,
+                                     self._led_results,
+                                     self._clock,
+                                     notify=self.wake)
+            for name in ('tail_leds', 'front_leds', 'status_leds'):
+                self._modules[name] = RemoteLeds(self._led_core,
+                                                 self._modules[name])
+            # the light sensor modifier is sent as a command
+            self._led_modules = (self._modules['tail_leds'],
+                                 self._modules['front_leds'],
+                                 self._modules['status_leds'])
+
+        # iterated every tick without creating views
+        module_names = tuple(
+            name for name, module in self._modules.items()
+            if not isinstance(module, RemoteLeds))
+        self._module_list = tuple(self._modules[name]
+                                  for name in module_names)
+        # the next time every module is due, modules have own periods
+        self._due = [0] * len(self._module_list)
+        # ticks which took longer than the tick length
+        self.overruns = 0
+        self.max_lateness = 0
+        # loop iterations, none while idle
+        self.wakeups = 0
+
+        # update durations of every module and of the loop steps in us
+        self._module_timings = tuple(Timing(name) for name in module_names)
+        self._events_timing = Timing('button_events')
+        self._mode_timing = Timing('mode')
+        # how late tick sleeps wake up
+        self._jitter = Timing('jitter')
+        self.timings = self._module_timings + (self._events_timing,
+                                               self._mode_timing,
+                                               self._jitter)
+        self._timings_logged = self._clock()
+
+        self._button = self._modules['button1']
+        self._board.set_button_handler(self._on_button_edge)
+
+        # polled every tick, each consumer has its own watchers
+        self._light_changes = self._state.watch(SENSOR, 'light')
+        self._button_changes = self._state.watch(BUTTON_EVENTS, 'button1')
+        # modes are checked only after what they wait for changed
+        self._finished_changes = tuple(
+            self._state.watch(ANIMATION_FINISHED, group)
+            for group in self._state.get_leds_types())
 
         # Set the initial mode
         self._update_mode(StartupMode(self._state))
 
     async def start(self):
-        """Start the control module routine."""
+        """
+        Start the control module routine.
+
+        The loop sleeps until the next module with updates is due
+        on a monotonic clock, so periods do not drift with the work
+        done in a tick. With no updates pending it idles until
+        a button edge or an external event.
+        """
         LOG.info('Control module started')
 
-        tasks = [None] * len(self._modules)
+        if self._led_core is None:
+            await self._run()
+            return
+
+        self._led_core.start()
+        try:
+            await self._run()
+        finally:
+            # a restarted control module starts a new one
+            self._led_core.stop()
+            LOG.drain()
+
+    async def _run(self):
+        """Control loop."""
+        now = self._clock()
+        for index in range(len(self._due)):
+            self._due[index] = now
         while True:
+            self.wakeups += 1
+            self._process_tick()
+
+            wake = self._next_due()
+            if wake is None:
+                await self._wakeup.wait()
+                continue
+
+            delay = ticks_diff(wake, self._clock())
+            if delay < 0:
+                # late ticks are not caught up, animations skip frames
+                self._account_overrun(-delay)
+                delay = 0
+            if delay > self._tick_ms:
+                # e.g. only the sensor is due, events can come first
+                await wait_ms(self._wakeup, delay)
+            else:
+                # yields to other tasks even if late
+                started = ticks_us()
+                await self._sleep(delay)
+                self._jitter.add(
+                    ticks_diff(ticks_us(), started) - delay * 1000)
+
+    def _process_tick(self):
+        """
+        Update due modules and handle events.
+
+        Does not allocate in a steady state, e.g. while normal mode
+        animations play: module updates are plain calls instead of
+        coroutines and everything they write to is preallocated.
+        """
+        if self._led_core is not None:
+            # messages of the led core are written by core 0
+            LOG.drain()
+            self._led_core.check()
+            # e.g. finished animations, subscribers run on core 0
+            self._led_results.run()
+        if self._light_changes.retrieve_changed():
             self._update_auto_brightness_modifier()
+        self._update_modules(self._clock())
+        if self._led_core is None:
+            # strips are sent once with all the frames of the tick
+            self._board.flush()
+
+        started = ticks_us()
+        self._handle_button_events()
+        self._events_timing.add(ticks_diff(ticks_us(), started))
+        started = ticks_us()
+        self._update_mode()
+        self._mode_timing.add(ticks_diff(ticks_us(), started))
+
+        if (ticks_diff(self._clock(), self._timings_logged)
+                >= self.TIMINGS_LOG_PERIOD):
+            self._log_timings()
+
+    def wake(self):
+        """Resume the loop from idle after an external event."""
+        self._wakeup.set()
 
-            # Defer module updates
-            for index, module in enumerate(self._modules.values()):
-                tasks[index] = asyncio.create_task(module.update())
+    def _on_button_edge(self, _pin=None):
+        """Button interrupt, the button is polled from the next tick."""
+        self._button.updates_available = True
+        self._wakeup.set()
 
-            await asyncio.sleep(self._tick)
+    def _next_due(self):
+        """Return when the next module with updates is due or None."""
+        modules = self._module_list
+        wake = None
+        for index in range(len(modules)):
+            if not modules[index].updates_available:
+                continue
+            due = self._due[index]
+            if wake is None or ticks_diff(due, wake) < 0:
+                wake = due
+        return wake
 
-            self._handle_button_events()
-            self._update_mode()
+    def _update_modules(self, now):
+        """Update modules which have updates and are due at now."""
+        modules = self._module_list
+        due = self._due
+        for index in range(len(modules)):
+            module = modules[index]
+            if not module.updates_available:
+                continue
+            if ticks_diff(now, due[index]) < 0:
+                continue
+            due[index] = ticks_add(due[index], module.period)
+            if ticks_diff(now, due[index]) >= 0:
+                # missed periods are not caught up
+                due[index] = ticks_add(now, module.period)
+            started = ticks_us()
+            module.update()
+            self._module_timings[index].add(ticks_diff(ticks_us(), started))
 
-            # exceptions from tasks could be raised here
-            await asyncio.gather(*tasks)
+    def _account_overrun(self, lateness):
+        """Record a tick which missed its deadline by lateness ms."""
+        self.overruns += 1
+        if lateness > self.max_lateness:
+            self.max_lateness = lateness
 
     def _toggle_modules(self):
         for module, enabled in self._mode.module_enabled.items():
@@ -88,6 +296,8 @@ class ControlModule:
     def _update_mode(self, mode=None):
         """Set a new mode explicitly of implicitly."""
         if not mode:
+            if not self._animations_finished():
+                return
             mode = self._mode.check_events()
 
         if mode:
@@ -108,13 +318,55 @@ class ControlModule:
         for group in ('tail', 'front', 'status'):
             brightness = self._mode.leds[group]['brightness']
             if brightness:
-                self._modules[f'{group}_leds'].set_all_leds_brightness(
-                    brightness)
+                fade = self._mode.leds[group].get('fade')
+                if fade:
+                    self._modules[f'{group}_leds'].fade_all_leds(brightness,
+                                                                 fade)
+                else:
+                    self._modules[f'{group}_leds'].set_all_leds_brightness(
+                        brightness)
 
     def _update_auto_brightness_modifier(self):
         brightness = self._state.get_sensor('light')
-        for module in ['tail_leds', 'front_leds', 'status_leds']:
-            self._modules[module].set_auto_brightness_modifier(brightness)
+        for module in self._led_modules:
+            module.set_auto_brightness_modifier(brightness)
+
+    def set_overlay(self, group, animation_name, layer='overlay',
+                    blend='max', alpha=1.0, animation_mode='once'):
+        """Play an animation above a led group one, e.g. a brake flash."""
+        self._modules[f'{group}_leds'].set_overlay(animation_name,
+                                                   layer,
+                                                   blend,
+                                                   alpha,
+                                                   animation_mode)
+        self.wake()
+
+    def remove_overlay(self, group, layer='overlay'):
+        """Stop an overlay of a led group."""
+        self._modules[f'{group}_leds'].remove_overlay(layer)
+        self.wake()
+
+    def timing_report(self):
+        """Return timings since the last log and overruns as lines."""
+        lines = [timing.summary() for timing in self.timings]
+        lines.append(f'overruns: {self.overruns} '
+                     f'max lateness {self.max_lateness} ms')
+        return '\n'.join(lines)
+
+    def _log_timings(self):
+        """Log the timings and start measuring again."""
+        for line in self.timing_report().split('\n'):
+            LOG.info(line)
+        for timing in self.timings:
+            timing.reset()
+        self._timings_logged = self._clock()
+
+    def led_write_stats(self):
+        """Return issued and suppressed led writes per group."""
+        return {
+            group: self._modules[f'{group}_leds'].write_stats()
+            for group in ('tail', 'front', 'status')
+        }
 
     # TODO: use for tests or remove
     def update_config(self, state):
@@ -123,9 +375,19 @@ class ControlModule:
         self._state.update(state)
         self._set_animations()
         self._set_brightness()
+        self.wake()
+
+    def _animations_finished(self):
+        """Return True if a finished animation changed, modes wait for it."""
+        changed = False
+        for watcher in self._finished_changes:
+            # every watcher is retrieved to see a change once
+            if watcher.retrieve_changed():
+                changed = True
+        return changed
 
     def _handle_button_events(self):
-        if self._state.has_button_events('button1'):
+        if self._button_changes.retrieve_changed():
             for event in self._state.get_button_events('button1'):
                 happened = self._state.retrieve_button_event('button1', event)
                 if happened:
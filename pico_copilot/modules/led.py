@@ -1,18 +1,32 @@
 """Led module."""
 
-import asyncio
+from array import array
 
 from pico_copilot.modules.animations.animation import (
     Animation,
 )
+from pico_copilot.modules.animations.compositor import (
+    Compositor,
+)
+from pico_copilot.utils.clock import MS_IN_SECOND, ticks_ms
+from pico_copilot.utils.fixed import MAX_DUTY
 from pico_copilot.utils.logger import LOG
 
 
 class LedManager:
-    """Module to control leds through PWM."""
+    """
+    Module to control leds through PWM.
+
+    Brightness goes from frames to the board as 0..65535 integers,
+    modifiers are applied as a single fixed point scale.
+    """
 
-    def __init__(self, board, state, name, tick_length):
-        """Led initialization."""
+    # scale of 1.0, MAX_DUTY times it stays within small ints
+    SCALE_SHIFT = 14
+
+    def __init__(self, board, state, name, tick_length, clock=ticks_ms,
+                 period=None):
+        """Led initialization, updated every period ms, a tick by default."""
 
         self._auto_brightness_modifier = 1.0
         self._hardware_brightness_modifier = 1.0
@@ -21,17 +35,43 @@ class LedManager:
         self._state = state
         self._name = name
         self._tick = tick_length
+        self.period = period or round(tick_length * MS_IN_SECOND)
+        self._clock = clock
         self._hardware_brightness_modifier = (
             self._state.get_leds_hardware_brightness_modifier(self._name))
+        self._scale = 0
+        self._update_scale()
+        # the state is written by handles, leds are in the same order
+        self._state_handle = self._state.get_leds_handle(self._name)
+        self._led_names = self._state.get_led_names(self._name)
         leds = self._state.get_leds_brightness(self._name)
-        self._led_names = leds.keys()
+        # resolved once, the board is written by handles
+        self._handles = tuple(self._board.get_led_handle(name)
+                              for name in self._led_names)
+        # frames of the whole group are written in a single call
+        self._group = self._board.add_led_group(self._handles)
+        # a strip showing the same frames, stretched over its pixels
+        self._strip = self._board.get_group_strip(self._name)
+        # the last duty written to every led of the group
+        self._duties = array('H', [0] * len(self._led_names))
+        # nothing was written yet
+        self._synced = False
+        self.writes_issued = 0
+        self.writes_suppressed = 0
         self._set_led_brightness(leds)
 
         self.updates_available = False
+        self._enabled = True
         self._current_animation = None
         self._animation_mode = None
 
         self._animation = None
+        self._compositor = Compositor(len(self._led_names))
+        self._base_finished = False
+        self._base_cycles = 0
+        # frames skipped by the current animation since it was set
+        self.skipped_frames = 0
+        self._reported_skipped_frames = 0
 
     def set_auto_brightness_modifier(self, brightness):
         """Set the auto brightness modifier."""
@@ -39,92 +79,195 @@ class LedManager:
             LOG.warning('Brightness modifier should be > 0 and < 1, got '
                         f'{brightness}')
             brightness = 1.0
-        self._auto_brightness_modifier = brightness
+        if brightness != self._auto_brightness_modifier:
+            self._auto_brightness_modifier = brightness
+            self._update_scale()
+
+    def _update_scale(self):
+        """Precompute the modifiers as a fixed point scale."""
+        self._scale = round(self._auto_brightness_modifier *
+                            self._hardware_brightness_modifier *
+                            (1 << self.SCALE_SHIFT))
 
     def set_all_leds_brightness(self, value):
         """Set all leds to a brightness."""
-        leds = {
-            led_name: {
-                'brightness': value
-            }
-            for led_name in self._led_names
-        }
-
         LOG.info(f'All LED brightness of {self._name} is set to: {value}')
-        self._set_led_brightness(leds)
+        if not 0.0 <= value <= 1.0:
+            LOG.error(f'Brightness value is out of bounds: {value}')
+            return
 
-    def _set_led_brightness(self, leds):
-        """Update leds params."""
-        for name, params in leds.items():
-            brightness = self._adjust_brightness(params['brightness'])
-            current_brightness = self._state.get_leds_brightness(
-                self._name)[name]['brightness']
-
-            if current_brightness != brightness:
-                # set the physical brightness
-                self._board.change_brightness(name, brightness)
-                # update the state to reflect the physical brightness
-                self._state.set_led_brightness(self._name, name, brightness)
-
-    def _adjust_brightness(self, brightness):
-        """Adjust brightness taking the auto brightness into account."""
-        if not (0.0 <= brightness <= 1.0):
-            LOG.error(f'Brightness value is out of bounds: {brightness}')
+        level = round(value * MAX_DUTY)
+        changed = False
+        for index in range(len(self._led_names)):
+            if self._write_led(index, level):
+                changed = True
+        if changed:
+            self._write_frame()
+        self._compositor.background = level
+        self._state.set_all_leds_brightness(self._name, value)
+
+    def fade_all_leds(self, value, duration):
+        """Fade all leds to a brightness in seconds, run by the board."""
+        if not 0.0 <= value <= 1.0:
+            LOG.error(f'Brightness value is out of bounds: {value}')
             return
 
-        brightness_value = (brightness * self._auto_brightness_modifier *
-                            self._hardware_brightness_modifier)
+        LOG.info(f'All LED brightness of {self._name} fades to: {value}')
+        level = round(value * MAX_DUTY)
+        duration = round(duration * MS_IN_SECOND)
+        self._compositor.background = level
+        self._state.set_all_leds_brightness(self._name, value)
+        duty = self._adjust_brightness(level)
+        for index in range(len(self._led_names)):
+            handle = self._handles[index]
+            if handle is not None:
+                self._board.ramp_duty(handle, duty, duration)
+            # the target is compared with, frames stop the ramp
+            self._state.set_led_duty_at(self._state_handle, index, duty)
+            self._duties[index] = duty
+        if self._strip is not None:
+            # strips are not ramped, they show the target right away
+            self._board.set_frame(self._strip, self._duties)
+        self._synced = True
+
+    def _set_led_brightness(self, leds):
+        """Update leds params, brightness is from 0.0 to 1.0."""
+        changed = False
+        for index, name in enumerate(self._led_names):
+            if name in leds:
+                brightness = leds[name]['brightness']
+                if not 0.0 <= brightness <= 1.0:
+                    LOG.error('Brightness value is out of bounds: '
+                              f'{brightness}')
+                    continue
+                if self._write_led(index, round(brightness * MAX_DUTY)):
+                    changed = True
+        if changed:
+            self._write_frame()
+
+    def _write_led(self, index, level):
+        """Update a led duty from a 0..65535 level, True if it changes."""
+        duty = self._adjust_brightness(level)
+        if self._synced and duty == self._duties[index]:
+            self.writes_suppressed += 1
+            return False
 
-        return brightness_value
+        # update the state to reflect the physical brightness
+        self._state.set_led_duty_at(self._state_handle, index, duty)
+        self._duties[index] = duty
+        self.writes_issued += 1
+        return True
+
+    def _write_frame(self):
+        """Set the physical brightness of the whole group."""
+        self._board.set_frame(self._group, self._duties)
+        if self._strip is not None:
+            self._board.set_frame(self._strip, self._duties)
+        self._synced = True
+
+    def write_stats(self):
+        """Return counters of issued and suppressed led writes."""
+        return {
+            'issued': self.writes_issued,
+            'suppressed': self.writes_suppressed,
+        }
+
+    def _adjust_brightness(self, level):
+        """Return a duty taking the auto brightness into account."""
+        return level * self._scale >> self.SCALE_SHIFT
 
     def set_animation(self, animation_name, animation_mode):
         """Play leds animation or disable it."""
+        self._base_finished = False
+        self._base_cycles = 0
+        self._state.set_leds_animation_finished_at(self._state_handle, False)
+
         if not (animation_name and animation_mode):
             LOG.info(f'LED {self._name}: animation disabled')
-            self.updates_available = False
             self._animation = None
+            self._compositor.remove_layer('base')
+            self.updates_available = (self._enabled
+                                      and self._compositor.has_overlays())
             return
 
-        self.updates_available = True
+        self.updates_available = self._enabled
         self._current_animation = animation_name
         self._animation_mode = animation_mode
-        self._animation = Animation(self._current_animation, self._tick)
+        self._animation = Animation(self._current_animation,
+                                    self._tick,
+                                    self._clock,
+                                    self.period)
+        self._compositor.set_layer('base',
+                                   self._animation,
+                                   repeat=animation_mode == 'repeat')
+        self.skipped_frames = 0
+        self._reported_skipped_frames = 0
         LOG.info(f'LED {self._name}: animation was set to '
                  f'{self._current_animation} ({self._animation_mode})')
 
-    async def update(self):
+    def set_overlay(self, animation_name, layer='overlay', blend='max',
+                    alpha=1.0, animation_mode='once'):
+        """Play an animation above the base one from the next tick."""
+        animation = Animation(animation_name, self._tick, self._clock,
+                              self.period)
+        self._compositor.set_layer(layer,
+                                   animation,
+                                   repeat=animation_mode == 'repeat',
+                                   blend=blend,
+                                   alpha=alpha)
+        self.updates_available = self._enabled
+        LOG.info(f'LED {self._name}: {layer} was set to {animation_name} '
+                 f'({blend}, {animation_mode})')
+
+    def remove_overlay(self, layer='overlay'):
+        """Stop an overlay, the base animation goes on where it is."""
+        self._compositor.remove_layer(layer)
+        LOG.info(f'LED {self._name}: {layer} was removed')
+
+    def update(self):
         if not self.updates_available:
             return
 
-        if self._animation:
-            if not self._animation.finished:
-                frame = self._animation.generate_frame()
-                # LOG.debug(f'Got frame {frame}')
-
-                leds = {
-                    led_name: {
-                        'brightness': led_brightness
-                    }
-                    for led_name,
-                    led_brightness in zip(self._led_names,
-                                          frame)
-                }
-                self._set_led_brightness(leds)
-            else:
-                if self._animation_mode == 'repeat':
-                    # LOG.debug('Repeating animation '
-                    #           f'"{self._current_animation}"')
-                    self._animation.reset()
-                    self._state.set_leds_animation_finished(self._name, False)
-
-                else:
-                    self.updates_available = False
-                    LOG.debug('Animation finished')
-                    self._state.set_leds_animation_finished(self._name, True)
+        frame = self._compositor.compose()
+        # LOG.debug(f'Got frame {frame}')
+
+        changed = False
+        for index in range(min(len(self._led_names), len(frame))):
+            if self._write_led(index, frame[index]):
+                changed = True
+        if changed:
+            self._write_frame()
+
+        base = self._compositor.get_layer('base')
+        if base is not None:
+            if base.cycles != self._base_cycles:
+                # LOG.debug('Repeating animation '
+                #           f'"{self._current_animation}"')
+                self._base_cycles = base.cycles
+                self._report_skipped_frames()
+            elif base.finished() and not self._base_finished:
+                self._base_finished = True
+                self._report_skipped_frames()
+                LOG.debug('Animation finished')
+                self._state.set_leds_animation_finished_at(self._state_handle,
+                                                           True)
+
+        if not self._compositor.active():
+            self.updates_available = False
+
+    def _report_skipped_frames(self):
+        """Warn once per animation cycle if the board is overloaded."""
+        self.skipped_frames = self._animation.skipped_total
+        skipped = self.skipped_frames - self._reported_skipped_frames
+        if skipped:
+            LOG.warning(f'LED {self._name}: {skipped} frames skipped')
+            self._reported_skipped_frames = self.skipped_frames
 
     def toggle(self, enabled):
         """Toggle the module."""
+        self._enabled = enabled
         self.updates_available = enabled
         LOG.info(f'LED {self._name} enabled: {enabled}')
         if not enabled:
+            self._compositor.clear()
             self.set_all_leds_brightness(0.0)
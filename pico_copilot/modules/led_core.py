@@ -0,0 +1,249 @@
+"""
+Led output on the second core.
+
+Led modules are updated by a loop on core 1 with _thread, the control
+loop on core 0 keeps inputs, modes and its own logging. The cores do
+not call each other, changes are sent as commands: a core queues them
+into one of two buffers under a lock, the other core swaps the buffers
+and runs the commands outside of the lock, so neither core waits for a
+frame or a command to finish. Changes of led modules go to the led
+core before every frame, changes of the state made by led modules go
+back to core 0 once per control tick. Messages logged on the led core
+are queued by the logger and written by core 0. On the host the same
+split runs in a thread of CPython _thread.
+
+The state belongs to core 0. Led modules on the led core see it
+through a CoreState: they only write led duties directly, the static
+brightness and finished animations are sent to core 0 as commands.
+"""
+
+import _thread
+
+from pico_copilot.utils.clock import block_ms, ticks_add, ticks_diff, ticks_ms
+
+
+class Commands:
+    """Commands from one core run by the other one."""
+
+    def __init__(self):
+        """Queue initialization."""
+        self._pending = []
+        self._running = []
+        self._lock = _thread.allocate_lock()
+
+    def post(self, function, *args):
+        """Call function(*args) on the other core."""
+        with self._lock:
+            self._pending.append((function, args))
+
+    def run(self):
+        """Swap the buffers and run the queued commands."""
+        with self._lock:
+            self._pending, self._running = self._running, self._pending
+        commands = self._running
+        if not commands:
+            return
+        try:
+            for function, args in commands:
+                function(*args)
+        finally:
+            # a failed command is not run again with the next buffer
+            commands.clear()
+
+
+class CoreState:
+    """
+    State of led modules on the led core, owned by core 0.
+
+    Getters read the state, led modules only use them when they are
+    created or set up by commands. Led duties are 16 bit array items
+    written by the led core only, core 0 reads them for reports.
+    Everything else which modes or subscribers see is changed by
+    commands run on core 0.
+    """
+
+    def __init__(self, state, results):
+        """Proxy initialization, results are run by core 0."""
+        self._state = state
+        self._results = results
+
+    def get_leds_handle(self, led_type):
+        """Get an integer handle of a led group."""
+        return self._state.get_leds_handle(led_type)
+
+    def get_led_names(self, led_type):
+        """Get led names of a group, led handles are their indexes."""
+        return self._state.get_led_names(led_type)
+
+    def get_leds_brightness(self, led_type):
+        """Get static brightness levels and current duties of leds."""
+        return self._state.get_leds_brightness(led_type)
+
+    def get_leds_hardware_brightness_modifier(self, led_type):
+        """Get hardware_brightness_modifier leds state."""
+        return self._state.get_leds_hardware_brightness_modifier(led_type)
+
+    def set_led_duty_at(self, leds, led, duty):
+        """Set a 0..65535 led duty, the led core owns duties."""
+        self._state.set_led_duty_at(leds, led, duty)
+
+    def set_all_leds_brightness(self, led_type, brightness):
+        """Set a static brightness level of all leds on core 0."""
+        self._results.post(self._state.set_all_leds_brightness,
+                           led_type,
+                           brightness)
+
+    def set_leds_animation_finished_at(self, leds, value):
+        """Set animation finished state on core 0."""
+        self._results.post(self._state.set_leds_animation_finished_at,
+                           leds,
+                           value)
+
+
+class LedCore:
+    """Updates led modules on the second core, fed by commands."""
+
+    def __init__(self, modules, board, results, clock=ticks_ms,
+                 sleep=block_ms, notify=None):
+        """
+        Led core initialization, modules must not be updated elsewhere.
+
+        Modules change the state through CoreState(state, results),
+        core 0 runs the results. notify() is called from the led core
+        when a module stops updating, e.g. an animation which modes
+        wait for finished.
+        """
+        self._modules = modules
+        self._notify = notify
+        self._board = board
+        self.results = results
+        self._clock = clock
+        self._sleep = sleep
+        # frames of the fastest module, the others skip frames
+        self._period = min(module.period for module in modules)
+        self._due = [0] * len(modules)
+
+        # queued by core 0, run before every frame
+        self._commands = Commands()
+        # held while the loop runs
+        self._stopped = _thread.allocate_lock()
+        self._running = False
+
+        self.frames = 0
+        self.overruns = 0
+        # the exception which stopped the loop
+        self.error = None
+
+    def post(self, function, *args):
+        """Call function(*args) on the led core before the next frame."""
+        self._commands.post(function, *args)
+
+    def start(self):
+        """Start the loop on the second core."""
+        self._running = True
+        self._stopped.acquire()
+        _thread.start_new_thread(self._run, ())
+
+    def stop(self):
+        """Stop the loop and wait for its last frame."""
+        self._running = False
+        self._stopped.acquire()
+        self._stopped.release()
+
+    def check(self):
+        """Raise the exception which stopped the loop, if any."""
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        """Led core loop, frames are scheduled against deadlines."""
+        try:
+            deadline = self._clock()
+            for index in range(len(self._due)):
+                self._due[index] = deadline
+            while self._running:
+                self._commands.run()
+                self._update_modules(self._clock())
+                # strips are sent once with all the frames
+                self._board.flush()
+                self.frames += 1
+
+                deadline = ticks_add(deadline, self._period)
+                delay = ticks_diff(deadline, self._clock())
+                if delay < 0:
+                    self.overruns += 1
+                    deadline = self._clock()
+                    delay = 0
+                self._sleep(delay)
+        except Exception as error:
+            self.error = error
+        finally:
+            self._running = False
+            self._stopped.release()
+
+    def _update_modules(self, now):
+        """Update led modules which have updates and are due at now."""
+        modules = self._modules
+        due = self._due
+        for index in range(len(modules)):
+            module = modules[index]
+            if not module.updates_available:
+                continue
+            if ticks_diff(now, due[index]) < 0:
+                continue
+            due[index] = ticks_add(due[index], module.period)
+            if ticks_diff(now, due[index]) >= 0:
+                # missed periods are not caught up
+                due[index] = ticks_add(now, module.period)
+            module.update()
+            if not module.updates_available and self._notify:
+                self._notify()
+
+
+class RemoteLeds:
+    """Led module stand-in on core 0, changes run on the led core."""
+
+    def __init__(self, core, leds):
+        """Stand-in initialization."""
+        self._core = core
+        self._leds = leds
+
+    def set_animation(self, animation_name, animation_mode):
+        """Play leds animation or disable it."""
+        self._core.post(self._leds.set_animation,
+                        animation_name,
+                        animation_mode)
+
+    def set_overlay(self, animation_name, layer='overlay', blend='max',
+                    alpha=1.0, animation_mode='once'):
+        """Play an animation above the base one from the next frame."""
+        self._core.post(self._leds.set_overlay,
+                        animation_name,
+                        layer,
+                        blend,
+                        alpha,
+                        animation_mode)
+
+    def remove_overlay(self, layer='overlay'):
+        """Stop an overlay."""
+        self._core.post(self._leds.remove_overlay, layer)
+
+    def set_auto_brightness_modifier(self, brightness):
+        """Set the auto brightness modifier."""
+        self._core.post(self._leds.set_auto_brightness_modifier, brightness)
+
+    def set_all_leds_brightness(self, value):
+        """Set all leds to a brightness."""
+        self._core.post(self._leds.set_all_leds_brightness, value)
+
+    def fade_all_leds(self, value, duration):
+        """Fade all leds to a brightness in seconds."""
+        self._core.post(self._leds.fade_all_leds, value, duration)
+
+    def toggle(self, enabled):
+        """Toggle the module."""
+        self._core.post(self._leds.toggle, enabled)
+
+    def write_stats(self):
+        """Return counters of led writes, read without the lock."""
+        return self._leds.write_stats()
@@ -183,6 +183,8 @@ class StaticMode(Mode):
                     'mode': None,
                 },
                 'brightness': 0.5,
+                # seconds, faded by the board
+                'fade': 0.5,
             },
             'front': {
                 'animation': {
@@ -190,6 +192,8 @@ class StaticMode(Mode):
                     'mode': None,
                 },
                 'brightness': 0.5,
+                # seconds, faded by the board
+                'fade': 0.5,
             },
             'status': {
                 'animation': {
@@ -197,6 +201,8 @@ class StaticMode(Mode):
                     'mode': None,
                 },
                 'brightness': 0.5,
+                # seconds, faded by the board
+                'fade': 0.5,
             },
         }
 
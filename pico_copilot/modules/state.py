@@ -1,91 +1,324 @@
-"""State module."""
+"""
+State module.
+
+The state is built once from a nested dict like board.state.STATE into
+slot objects: a LedsState per led group with a brightness list and
+a duty array per led, a SensorState per sensor and a ButtonState per button.
+A led brightness is its static level from 0.0 to 1.0, set by the config
+or by a brightness change of the group, animations do not change it.
+A led duty is what the board shows, animations and modifiers included.
+Groups and leds have integer handles for the per tick accessors, the
+name based methods are kept for everything else.
+
+Changes of sensor values, finished animations and button events are
+tracked: a change counter per value, written by the setter only, and
+subscribers called by the setter. Consumers polling a value get their
+own Watcher remembering the last change they saw, so consumers do not
+clear changes for each other and a change is never lost between
+reading and clearing a shared flag.
+
+The state is not locked, it belongs to the control loop on core 0.
+With the led core running (see modules.led_core) led modules change
+it through a CoreState: led duties are written by the led core only,
+brightness levels and finished animations are set on core 0.
+"""
+
+from array import array
 
 from pico_copilot.utils.logger import LOG
 
+# keys of tracked values
+SENSOR = 'sensor'
+ANIMATION_FINISHED = 'animation_finished'
+BUTTON_EVENTS = 'button_events'
+# change counters wrap within small ints
+CHANGES_MASK = 0x3FFFFFFF
+
+
+class Watch:
+    """Change counter and subscribers of a state value."""
+
+    __slots__ = ('changes', 'subscribers')
+
+    def __init__(self):
+        """Watch initialization."""
+        self.changes = 0
+        self.subscribers = []
+
+    def changed(self, value):
+        """Count a change of the value and call the subscribers with it."""
+        self.changes = (self.changes + 1) & CHANGES_MASK
+        for callback in self.subscribers:
+            callback(value)
+
+
+class Watcher:
+    """Changes of a state value seen by a single consumer."""
+
+    __slots__ = ('_watch', '_seen')
+
+    def __init__(self, watch):
+        """Watcher initialization, the initial value counts as a change."""
+        self._watch = watch
+        self._seen = -1
+
+    def retrieve_changed(self):
+        """Return True once after the value changed."""
+        changes = self._watch.changes
+        if changes == self._seen:
+            return False
+        self._seen = changes
+        return True
+
+
+class LedsState:
+    """State of a led group, leds are indexed by their handles."""
+
+    __slots__ = ('hardware_brightness_modifier', 'animation_playing',
+                 'animation_mode', 'animation_finished', 'finished_watch',
+                 'led_names', 'brightness', 'duties')
+
+    def __init__(self, state):
+        """Group state from its dict."""
+        group_state = state['state']
+        self.hardware_brightness_modifier = group_state[
+            'hardware_brightness_modifier']
+        self.animation_playing = group_state['animation_playing']
+        self.animation_mode = group_state['animation_mode']
+        self.animation_finished = group_state['animation_finished']
+        self.finished_watch = Watch()
+
+        leds = state['leds']
+        self.led_names = tuple(leds.keys())
+        # Python floats, a float32 array would not keep the set values
+        self.brightness = [float(led['brightness']) for led in leds.values()]
+        # duties written to the board, 0..65535
+        self.duties = array('H', [led.get('duty', 0)
+                                  for led in leds.values()])
+
+
+class SensorState:
+    """State of a sensor."""
+
+    __slots__ = ('value', 'update_interval', 'watch')
+
+    def __init__(self, state):
+        """Sensor state from its dict."""
+        self.value = state['value']
+        self.update_interval = state['update_interval']
+        self.watch = Watch()
+
+
+class ButtonState:
+    """Pending events of a button."""
+
+    __slots__ = ('event_names', 'events', 'watch')
+
+    def __init__(self, state):
+        """Button state from its dict."""
+        self.event_names = tuple(state.keys())
+        self.events = bytearray(1 if happened else 0
+                                for happened in state.values())
+        self.watch = Watch()
+
 
 class State:
     """Module to control the state."""
 
     def __init__(self, state):
         """All modules initialization."""
-        self._state = state.copy()
-        self._max_brightness = 1
+        self._build(state)
 
     def update(self, state):
-        """Externally change the state."""
-        self._state = state.copy()
+        """
+        Externally change the state, handles and subscribers stay.
+
+        Known groups, sensors and buttons are replaced in place, new
+        ones are added and get new handles. Leds of a known group must
+        stay the same, led handles are their indexes.
+        """
+        groups = [(led_type, LedsState(group_state))
+                  for led_type, group_state in state['leds'].items()]
+        for led_type, group in groups:
+            handle = self._leds_handles.get(led_type)
+            if (handle is not None
+                    and group.led_names != self._leds[handle].led_names):
+                raise ValueError(f'Leds of {led_type} can not change, got '
+                                 f'{group.led_names}')
+
+        # every tracked value may have changed
+        for led_type, group in groups:
+            handle = self._leds_handles.get(led_type)
+            if handle is None:
+                self._leds_handles[led_type] = len(self._leds)
+                self._leds.append(group)
+                continue
+            group.finished_watch = self._leds[handle].finished_watch
+            self._leds[handle] = group
+            group.finished_watch.changed(group.animation_finished)
+        for name, sensor_state in state['sensors'].items():
+            sensor = SensorState(sensor_state)
+            if name in self._sensors:
+                sensor.watch = self._sensors[name].watch
+                sensor.watch.changed(sensor.value)
+            self._sensors[name] = sensor
+        for name, button_state in state['buttons'].items():
+            button = ButtonState(button_state)
+            if name in self._buttons:
+                button.watch = self._buttons[name].watch
+                button.watch.changed(button.events)
+            self._buttons[name] = button
+
+    def _build(self, state):
+        """Convert a state dict, it is not referenced afterwards."""
+        self._leds_handles = {}
+        self._leds = []
+        for led_type, group_state in state['leds'].items():
+            self._leds_handles[led_type] = len(self._leds)
+            self._leds.append(LedsState(group_state))
+        self._sensors = {name: SensorState(sensor_state)
+                         for name, sensor_state in state['sensors'].items()}
+        self._buttons = {name: ButtonState(button_state)
+                         for name, button_state in state['buttons'].items()}
+
+    def subscribe(self, key, name, callback):
+        """
+        Call callback(value) when a tracked value changes.
+
+        Callbacks are called by the setter, always on core 0.
+        """
+        self._get_watch(key, name).subscribers.append(callback)
+
+    def watch(self, key, name):
+        """Return a Watcher of a tracked value for a single consumer."""
+        return Watcher(self._get_watch(key, name))
+
+    def _get_watch(self, key, name):
+        """Get a watch of a tracked value."""
+        if key == SENSOR:
+            return self._sensors[name].watch
+        if key == ANIMATION_FINISHED:
+            return self._leds[self._leds_handles[name]].finished_watch
+        if key == BUTTON_EVENTS:
+            return self._buttons[name].watch
+        raise ValueError(f'Unknown state key {key}')
+
+    def get_leds_types(self):
+        """Get names of all led groups in the order of their handles."""
+        return tuple(self._leds_handles)
+
+    def get_leds_handle(self, led_type):
+        """Get an integer handle of a led group."""
+        return self._leds_handles[led_type]
+
+    def get_led_names(self, led_type):
+        """Get led names of a group, led handles are their indexes."""
+        return self._leds[self._leds_handles[led_type]].led_names
 
     def get_leds_brightness(self, led_type):
-        """Get leds brightness."""
-        return self._state['leds'][led_type]['leds']
+        """Get static brightness levels and current duties of leds."""
+        group = self._leds[self._leds_handles[led_type]]
+        return {
+            name: {'brightness': group.brightness[led],
+                   'duty': group.duties[led]}
+            for led, name in enumerate(group.led_names)
+        }
 
     def get_leds_hardware_brightness_modifier(self, led_type):
         """Get hardware_brightness_modifier leds state."""
-        return self._state['leds'][led_type]['state'][
-            'hardware_brightness_modifier']
+        return self._leds[
+            self._leds_handles[led_type]].hardware_brightness_modifier
 
     def get_leds_animation_playing(self, led_type):
         """Get animation playing leds state."""
-        return self._state['leds'][led_type]['state']['animation_playing']
+        return self._leds[self._leds_handles[led_type]].animation_playing
 
     def get_leds_animation_mode(self, led_type):
         """Get animation mode leds state."""
-        return self._state['leds'][led_type]['state']['animation_mode']
+        return self._leds[self._leds_handles[led_type]].animation_mode
 
     def get_leds_animation_finished(self, led_type):
         """Get animation finished leds state."""
-        return self._state['leds'][led_type]['state']['animation_finished']
+        return self._leds[self._leds_handles[led_type]].animation_finished
 
     def set_led_brightness(self, led_type, led_name, brightness):
-        """Set led brightness."""
-        self._state['leds'][led_type]['leds'][led_name] = {
-            'brightness': brightness
-        }
+        """Set a static led brightness level."""
+        group = self._leds[self._leds_handles[led_type]]
+        group.brightness[group.led_names.index(led_name)] = brightness
+
+    def set_led_duty(self, led_type, led_name, duty):
+        """Set a 0..65535 led duty written to the board."""
+        group = self._leds[self._leds_handles[led_type]]
+        group.duties[group.led_names.index(led_name)] = duty
+
+    def set_led_duty_at(self, leds, led, duty):
+        """Set a 0..65535 led duty by group and led handles."""
+        self._leds[leds].duties[led] = duty
 
     def set_all_leds_brightness(self, led_type, brightness):
-        """Set all leds brightness."""
-        for value in self._state['leds'][led_type]['leds'].values():
-            value['brightness'] = brightness
+        """Set a static brightness level of all leds."""
+        group_brightness = self._leds[self._leds_handles[led_type]].brightness
+        for led in range(len(group_brightness)):
+            group_brightness[led] = brightness
 
     def set_leds_animation_finished(self, led_type, value):
         """Set animation finished leds state."""
-        self._state['leds'][led_type]['state']['animation_finished'] = value
+        self.set_leds_animation_finished_at(self._leds_handles[led_type],
+                                            value)
+
+    def set_leds_animation_finished_at(self, leds, value):
+        """Set animation finished state by a group handle."""
+        group = self._leds[leds]
+        if group.animation_finished != value:
+            group.animation_finished = value
+            group.finished_watch.changed(value)
 
     def set_leds_animation_playing(self, led_type, value):
         """Set a playing animation name leds state."""
-        self._state['leds'][led_type]['state']['animation_playing'] = value
+        self._leds[self._leds_handles[led_type]].animation_playing = value
 
     def set_leds_animation_mode(self, led_type, value):
         """Set a playing animation mode leds state."""
-        self._state['leds'][led_type]['state']['animation_mode'] = value
+        self._leds[self._leds_handles[led_type]].animation_mode = value
 
     def get_sensor(self, sensor_name):
         """Get sensor value."""
-        return self._state['sensors'][sensor_name]['value']
+        return self._sensors[sensor_name].value
 
     def get_sensor_update_interval(self, sensor_name):
         """Get sensor update interval."""
-        return self._state['sensors'][sensor_name]['update_interval']
+        return self._sensors[sensor_name].update_interval
 
     def set_sensor(self, sensor_name, value):
         """Set sensor data."""
-        self._state['sensors'][sensor_name]['value'] = value
+        sensor = self._sensors[sensor_name]
+        if sensor.value != value:
+            sensor.value = value
+            sensor.watch.changed(value)
 
     def get_button_events(self, button_name):
         """Get button states."""
-        return self._state['buttons'][button_name].keys()
+        return self._buttons[button_name].event_names
 
     def add_button_event(self, button_name, event):
         """Set.button event true"""
-        self._state['buttons'][button_name][event] = True
+        button = self._buttons[button_name]
+        button.events[button.event_names.index(event)] = 1
+        button.watch.changed(button.events)
 
     def retrieve_button_event(self, button_name, event):
         """Set.button event true"""
-        hapenned = self._state['buttons'][button_name][event]
+        button = self._buttons[button_name]
+        index = button.event_names.index(event)
+        hapenned = button.events[index] == 1
         if hapenned:
-            self._state['buttons'][button_name][event] = False
+            button.events[index] = 0
         return hapenned
 
     def has_button_events(self, button_name):
-        return any(value
-                   for value in self._state['buttons'][button_name].values())
+        events = self._buttons[button_name].events
+        # checked every tick without allocating
+        for index in range(len(events)):
+            if events[index]:
+                return True
+        return False
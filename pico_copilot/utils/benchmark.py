@@ -0,0 +1,158 @@
+"""
+Led path benchmark.
+
+Heap bytes and time per tick of the led output, on the host:
+    python3 -m pico_copilot.utils.benchmark
+on the Pico (heap is only measured there):
+    import pico_copilot.utils.benchmark as b; b.main()
+"""
+
+import gc
+
+from pico_copilot.board.state import STATE
+from pico_copilot.modules.led import LedManager
+from pico_copilot.modules.led_core import Commands, CoreState, LedCore
+from pico_copilot.modules.state import State
+from pico_copilot.utils.clock import (
+    MS_IN_SECOND,
+    block_ms,
+    ticks_diff,
+    ticks_us,
+)
+from pico_copilot.utils.fixed import MAX_DUTY
+
+TICK_LENGTH = 0.01
+TICKS = 500
+LEVELS = 2000
+COMMANDS = 1000
+
+
+class _NullBoard:
+    """Board interface which drops writes."""
+
+    def get_led_handle(self, name):
+        return 0
+
+    def add_led_group(self, handles):
+        return 0
+
+    def get_group_strip(self, led_type):
+        return None
+
+    def set_frame(self, group_handle, duties):
+        pass
+
+    def flush(self):
+        pass
+
+
+def _mem_alloc():
+    """Return heap bytes allocated so far or None on the host."""
+    if hasattr(gc, 'mem_alloc'):
+        return gc.mem_alloc()
+    return None
+
+
+def _measure(function, count):
+    """Return heap bytes and us per call, GC is off while measuring."""
+    gc.collect()
+    gc.disable()
+    memory = _mem_alloc()
+    start = ticks_us()
+    function()
+    elapsed = ticks_diff(ticks_us(), start)
+    if memory is not None:
+        memory = (_mem_alloc() - memory) / count
+    gc.enable()
+    return memory, elapsed / count
+
+
+def _float_duties():
+    """Frame value through float modifiers to a duty, as it used to be."""
+    auto = 0.5
+    hardware = 0.7
+    for level in range(LEVELS):
+        brightness = level / MAX_DUTY
+        round(MAX_DUTY * (brightness * auto * hardware))
+
+
+def _integer_duties():
+    """Frame value through a fixed point scale to a duty."""
+    scale = round(0.5 * 0.7 * (1 << LedManager.SCALE_SHIFT))
+    for level in range(LEVELS):
+        level * scale >> LedManager.SCALE_SHIFT
+
+
+def _led_ticks():
+    """Play the tail animation, return a function doing all the ticks."""
+    now = [0]
+    led = LedManager(_NullBoard(), State(STATE), 'tail', TICK_LENGTH,
+                     lambda: now[0])
+    led.set_auto_brightness_modifier(0.5)
+    led.set_animation('startup', 'repeat')
+    tick_ms = round(TICK_LENGTH * MS_IN_SECOND)
+
+    def ticks():
+        for _ in range(TICKS):
+            led.update()
+            now[0] += tick_ms
+
+    return ticks
+
+
+def _state_by_names():
+    """Led duty and animation state writes by names."""
+    state = State(STATE)
+    for level in range(LEVELS):
+        state.set_led_duty('front', 'front_4', level)
+        state.set_leds_animation_finished('front', False)
+
+
+def _state_by_handles():
+    """Led duty and animation state writes by handles, as led modules do."""
+    state = State(STATE)
+    leds = state.get_leds_handle('front')
+    led = state.get_led_names('front').index('front_4')
+    for level in range(LEVELS):
+        state.set_led_duty_at(leds, led, level)
+        state.set_leds_animation_finished_at(leds, False)
+
+
+def _led_core_commands():
+    """Return a function sending commands through a running led core."""
+    results = Commands()
+    state = CoreState(State(STATE), results)
+    led = LedManager(_NullBoard(), state, 'tail', TICK_LENGTH)
+    core = LedCore((led,), _NullBoard(), results)
+    applied = []
+
+    def commands():
+        core.start()
+        for value in range(COMMANDS):
+            core.post(applied.append, value)
+        # until the led core ran all of them
+        while len(applied) < COMMANDS:
+            block_ms(1)
+        core.stop()
+
+    return commands
+
+
+def _print(name, result):
+    memory, us = result
+    memory = 'n/a' if memory is None else f'{memory:.1f}'
+    print(f'{name:16} {memory:>10} {us:10.2f}')
+
+
+def main():
+    print(f'{"path":16} {"B/call":>10} {"us/call":>10}')
+    _print('float duty', _measure(_float_duties, LEVELS))
+    _print('integer duty', _measure(_integer_duties, LEVELS))
+    _print('state by names', _measure(_state_by_names, LEVELS))
+    _print('state by handles', _measure(_state_by_handles, LEVELS))
+    _print('led tick', _measure(_led_ticks(), TICKS))
+    _print('led core command', _measure(_led_core_commands(), COMMANDS))
+
+
+if __name__ == '__main__':
+    main()
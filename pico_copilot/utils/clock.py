@@ -0,0 +1,42 @@
+"""Monotonic clock: MicroPython ticks API with a host fallback."""
+
+MS_IN_SECOND = 1000
+
+try:
+    from asyncio import sleep_ms
+except ImportError:
+    from asyncio import sleep
+
+    async def sleep_ms(delay):
+        """Sleep for delay milliseconds."""
+        await sleep(delay / MS_IN_SECOND)
+
+try:
+    from time import sleep_ms as block_ms
+except ImportError:
+    from time import sleep as _block
+
+    def block_ms(delay):
+        """Block the thread for delay milliseconds."""
+        _block(delay / MS_IN_SECOND)
+
+try:
+    from time import ticks_add, ticks_diff, ticks_ms, ticks_us
+except ImportError:
+    from time import monotonic_ns
+
+    def ticks_ms():
+        """Return monotonic milliseconds."""
+        return monotonic_ns() // 1000000
+
+    def ticks_us():
+        """Return monotonic microseconds."""
+        return monotonic_ns() // 1000
+
+    def ticks_diff(ticks1, ticks2):
+        """Return signed ticks1 - ticks2."""
+        return ticks1 - ticks2
+
+    def ticks_add(ticks, delta):
+        """Return ticks shifted by delta."""
+        return ticks + delta
@@ -0,0 +1,11 @@
+"""
+Integer duty pipeline.
+
+Brightness goes from keyframes through blending and modifiers to PWM
+as 0..MAX_DUTY integers, fractions are fixed point of SCALE.
+MAX_DUTY times SCALE stays within small ints.
+"""
+
+MAX_DUTY = 65535
+# fixed point 1.0 of a progress, alpha or curve
+SCALE = 1024
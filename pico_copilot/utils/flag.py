@@ -0,0 +1,51 @@
+"""Wakeup flag: MicroPython asyncio.ThreadSafeFlag with a host fallback."""
+
+import asyncio
+
+from pico_copilot.utils.clock import MS_IN_SECOND
+
+try:
+    from asyncio import ThreadSafeFlag
+except ImportError:
+    class ThreadSafeFlag:
+        """Flag which can be set from interrupts or other threads."""
+
+        def __init__(self):
+            self._loop = None
+            self._event = None
+            self._pending = False
+
+        def set(self):
+            """Wake up the waiting task."""
+            if self._loop is None:
+                self._pending = True
+            else:
+                self._loop.call_soon_threadsafe(self._event.set)
+
+        def clear(self):
+            """Forget a wakeup which was not waited for."""
+            self._pending = False
+            if self._event is not None:
+                self._event.clear()
+
+        async def wait(self):
+            """Wait for the flag and clear it."""
+            if self._loop is None:
+                self._loop = asyncio.get_running_loop()
+                self._event = asyncio.Event()
+                if self._pending:
+                    self._event.set()
+            await self._event.wait()
+            self._event.clear()
+
+
+async def wait_ms(flag, timeout):
+    """Wait for a flag at most timeout ms, return True if it was set."""
+    try:
+        if hasattr(asyncio, 'wait_for_ms'):
+            await asyncio.wait_for_ms(flag.wait(), timeout)
+        else:
+            await asyncio.wait_for(flag.wait(), timeout / MS_IN_SECOND)
+    except asyncio.TimeoutError:
+        return False
+    return True
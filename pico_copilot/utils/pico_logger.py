@@ -1,7 +1,20 @@
-"""Custom logger module for raspberry pico."""
+"""
+Custom logger module for raspberry pico.
 
+Only the thread which created a logger writes, e.g. core 0. Messages
+of other threads, e.g. the led core, are pushed into a preallocated
+ring buffer of levels and texts, see utils.ring. They are written by
+the next message or drain() of the main thread, so the cores never
+share the file or wait for each other.
+"""
+
+from _thread import get_ident
 from os import stat
 
+from pico_copilot.utils.ring import RingBuffer
+
+MESSAGES_SIZE = 32
+
 
 class PicoLogger:
     FILENAME = 'log.txt'
@@ -10,6 +23,11 @@ class PicoLogger:
         self.name = name
 
         self._max_file_size = 1024 * 50  # 50 kb
+        # e.g. the led core logs through core 0
+        self._main_thread = get_ident()
+        self._messages = RingBuffer([None] * MESSAGES_SIZE,
+                                    [None] * MESSAGES_SIZE)
+        self._dropped = 0
         self._file_size = self._get_file_size()
 
         # TBD: buffering
@@ -19,32 +37,43 @@ class PicoLogger:
             self._write(file, '------------------------------------\n')
 
     def debug(self, text):
-        print(f'DEBUG: {text}')
-        with open(self.FILENAME,
-                  self._get_file_mode(),
-                  encoding='utf-8') as file:
-            self._write(file, f'DEBUG: {text}\n')
+        self._log('DEBUG', text)
 
     def info(self, text):
-        print(f'INFO: {text}')
-        with open(self.FILENAME,
-                  self._get_file_mode(),
-                  encoding='utf-8') as file:
-            self._write(file, f'INFO: {text}\n')
+        self._log('INFO', text)
 
     def warning(self, text):
-        print(f'WARNING: {text}')
-        with open(self.FILENAME,
-                  self._get_file_mode(),
-                  encoding='utf-8') as file:
-            self._write(file, f'WARNING: {text}\n')
+        self._log('WARNING', text)
 
     def error(self, text):
-        print(f'ERROR: {text}')
+        self._log('ERROR', text)
+
+    def drain(self):
+        """Write messages queued by other threads, from the main one."""
+        messages = self._messages
+        while len(messages):
+            level, text = messages.pop()
+            self._print(level, text)
+        if messages.dropped != self._dropped:
+            self._print('WARNING', f'{messages.dropped - self._dropped} '
+                        'log messages of other threads dropped')
+            self._dropped = messages.dropped
+
+    def _log(self, level, text):
+        """Write a message, other threads only queue it."""
+        if get_ident() != self._main_thread:
+            self._messages.push(level, text)
+            return
+        # keeps the order of messages queued before
+        self.drain()
+        self._print(level, text)
+
+    def _print(self, level, text):
+        print(f'{level}: {text}')
         with open(self.FILENAME,
                   self._get_file_mode(),
                   encoding='utf-8') as file:
-            self._write(file, f'ERROR: {text}\n')
+            self._write(file, f'{level}: {text}\n')
 
     def _get_file_size(self):
         try:
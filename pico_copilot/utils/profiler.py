@@ -0,0 +1,59 @@
+"""
+Loop timing instrumentation.
+
+Durations are measured with ticks_us. Counters and histograms are
+preallocated, adding a sample does not allocate on the board, so the
+timings can stay on in production.
+"""
+
+from array import array
+
+# upper bucket bounds in us, the last bucket counts everything above
+BUCKETS = (100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Timing:
+    """Min, avg, max and a histogram of durations in us."""
+
+    def __init__(self, name):
+        """Timing initialization."""
+        self.name = name
+        self.histogram = array('L', [0] * (len(BUCKETS) + 1))
+        self.reset()
+
+    def reset(self):
+        """Forget all the samples."""
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+        histogram = self.histogram
+        for bucket in range(len(histogram)):
+            histogram[bucket] = 0
+
+    def add(self, duration):
+        """Add a duration in us."""
+        if self.count == 0 or duration < self.min:
+            self.min = duration
+        if self.count == 0 or duration > self.max:
+            self.max = duration
+        self.count += 1
+        self.total += duration
+
+        bucket = 0
+        for bound in BUCKETS:
+            if duration <= bound:
+                break
+            bucket += 1
+        self.histogram[bucket] += 1
+
+    @property
+    def avg(self):
+        """Return the average duration in us."""
+        return self.total // self.count if self.count else 0
+
+    def summary(self):
+        """Return a line with all the values."""
+        return (f'{self.name}: n {self.count} min {self.min} '
+                f'avg {self.avg} max {self.max} us, '
+                f'histogram {list(self.histogram)}')
@@ -0,0 +1,49 @@
+"""
+Single producer, single consumer ring buffer.
+
+Pairs of values are kept in two preallocated columns, e.g. arrays or
+lists. The producer, e.g. an interrupt or the second core, only writes
+the head and the consumer only writes the tail, so neither needs
+a lock or to disable interrupts. Pairs which do not fit are dropped
+and counted.
+"""
+
+
+class RingBuffer:
+    """Ring buffer of (first, second) pairs."""
+
+    def __init__(self, first, second):
+        """Buffer of two columns of the same length, holds one less."""
+        self._size = len(first)
+        self._first = first
+        self._second = second
+        self._head = 0
+        self._tail = 0
+        self.dropped = 0
+
+    def push(self, first, second):
+        """Add a pair, only the producer calls it."""
+        head = self._head
+        following = head + 1
+        if following == self._size:
+            following = 0
+        if following == self._tail:
+            self.dropped += 1
+            return
+        self._first[head] = first
+        self._second[head] = second
+        # published only when the pair is written
+        self._head = following
+
+    def pop(self):
+        """Remove the oldest pair, return (first, second) or None."""
+        tail = self._tail
+        if tail == self._head:
+            return None
+        pair = (self._first[tail], self._second[tail])
+        tail += 1
+        self._tail = 0 if tail == self._size else tail
+        return pair
+
+    def __len__(self):
+        return (self._head - self._tail) % self._size
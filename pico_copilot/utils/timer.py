@@ -0,0 +1,37 @@
+"""Hardware timer: MicroPython machine.Timer with a host fallback."""
+
+try:
+    from machine import Timer
+except ImportError:
+    from threading import Event, Thread
+
+    from pico_copilot.utils.clock import MS_IN_SECOND
+
+    class Timer:
+        """Timer calling back from a thread."""
+
+        ONE_SHOT = 0
+        PERIODIC = 1
+
+        def __init__(self):
+            self._stopped = None
+
+        def init(self, mode=PERIODIC, period=-1, callback=None):
+            """Start calling back every period ms."""
+            self.deinit()
+            stopped = Event()
+            self._stopped = stopped
+
+            def run():
+                while not stopped.wait(period / MS_IN_SECOND):
+                    callback(self)
+                    if mode == Timer.ONE_SHOT:
+                        break
+
+            Thread(target=run, daemon=True).start()
+
+        def deinit(self):
+            """Stop the timer, can be called from its callback."""
+            if self._stopped is not None:
+                self._stopped.set()
+                self._stopped = None
@@ -11,7 +11,36 @@ from tkinter import (Tk,
                      VERTICAL)
 from colorsys import hsv_to_rgb
 
+from pico_copilot.board.edges import EdgeBuffer
+from pico_copilot.board.ramp import Ramps
+from pico_copilot.board.strip import COLOR_ORDERS, BYTES_PER_PIXEL, Strip
+from pico_copilot.utils.clock import ticks_ms
+from pico_copilot.utils.fixed import MAX_DUTY
 from pico_copilot.utils.logger import LOG
+from pico_copilot.utils.timer import Timer
+
+
+class StripWindow:
+    """Strip driver keeping the last sent framebuffer to be drawn."""
+
+    def __init__(self, order):
+        """Driver initialization."""
+        self.offsets = COLOR_ORDERS[order]
+        self.buffer = None
+        self.updated = False
+
+    def write(self, buffer):
+        """Keep a copy of a framebuffer, it is drawn by the window."""
+        self.buffer = bytes(buffer)
+        self.updated = True
+
+    def get_html_colors(self):
+        """Return colors of all pixels."""
+        red, green, blue = self.offsets
+        return ['#%02x%02x%02x' % (self.buffer[index + red],
+                                   self.buffer[index + green],
+                                   self.buffer[index + blue])
+                for index in range(0, len(self.buffer), BYTES_PER_PIXEL)]
 
 
 class Emulator:
@@ -19,11 +48,12 @@ class Emulator:
     Test Emulator GUI.
 
     Usage:
-        EMULATOR = Emulator()
+        EMULATOR = Emulator(BOARD_CONFIG.get('strips'))
         # blocking call:
         EMULATOR.display()
         # in a separate thread:
-        EMULATOR.set_led_brightness(name, brightness)
+        handle = EMULATOR.get_led_handle(name)
+        EMULATOR.set_led_brightness(handle, brightness)
     """
 
     MAX_BRIGHTNESS = 1.0
@@ -32,8 +62,8 @@ class Emulator:
     GREEN_HSV_COLOR = [0.3333, 1, 1]
     RED_HSV_COLOR = [0, 1, 1]
 
-    def __init__(self):
-        """Init the window params."""
+    def __init__(self, strips=None):
+        """Init the window params, strips are configured like a board."""
         self._root = None
         self._tail_light_frame = None
         self._front_light_frame = None
@@ -48,12 +78,18 @@ class Emulator:
         self._front_light_width = self._window_width // 3
         self._front_light_height = self._window_height
 
+        self._pixel_size = 10
+
         self._status_light_width = self._window_width // 6
         self._status_light_height = self._window_height
 
         self._button_width = self._window_width // 200
         self._button_height = self._window_height // 100
         self._button_pressed = False
+        self._button_edges = EdgeBuffer()
+        self._button_handler = None
+        self._timing_source = None
+        self._timing_text = None
 
         self._colors = {
             'tail': {
@@ -85,27 +121,103 @@ class Emulator:
             },
         }
 
+        # leds of all groups in a flat list, handles are indexes
+        self._channels = []
+        self._handles = {}
+        # channel handles of led groups, in the order of their frames
+        self._groups = []
+        for led_group in ('tail', 'front', 'status'):
+            for name in self._colors[led_group]['leds']:
+                self._handles[name] = len(self._channels)
+                self._channels.append((led_group, name))
+        # fades run from a timer thread like from a Pico timer
+        self._ramps = Ramps(len(self._channels), self._write_duty, Timer())
+
+        # strips are group handles too, drawn from what they flush
+        self._strips = []
+        self._strip_handles = {}
+        for name, params in (strips or {}).items():
+            window = StripWindow(params.get('order', 'GRB'))
+            strip = Strip(params['pixels'],
+                          window,
+                          params.get('color', (255, 255, 255)),
+                          params.get('order', 'GRB'))
+            self._strip_handles[name] = len(self._groups)
+            self._groups.append(strip)
+            self._strips.append((strip, window))
+
         self._create_window()
 
     def display(self):
         """Display the main window. Blocking call."""
         self._root.mainloop()
 
-    def set_led_brightness(self, name, brightness):
-        """Set led brightness based on its name."""
-        known_name = False
-        # TODO: simplify
-        for led_group in ('tail', 'front', 'status'):
-            if name in self._colors[led_group]['leds']:
-                known_name = True
-                self._colors[led_group]['leds'][name] = (
-                    self._get_tinted_html_color(
-                        self._colors[led_group]['color'],
-                        brightness))
-                # LOG.debug(f'{led_group} {name} was set to {brightness}')
-                self._colors[led_group]['status'] = True
-        if not known_name:
-            LOG.warning('Unknown led name')
+    def get_led_handle(self, name):
+        """Return a led handle to write with or None if it is unknown."""
+        handle = self._handles.get(name)
+        if handle is None:
+            LOG.warning(f'Unknown led name {name}')
+        return handle
+
+    def add_led_group(self, handles):
+        """Return a group handle to write frames of these leds with."""
+        self._groups.append(tuple(handles))
+        return len(self._groups) - 1
+
+    def get_strip_handle(self, name):
+        """Return a group handle of a strip or None if it is unknown."""
+        handle = self._strip_handles.get(name)
+        if handle is None:
+            LOG.warning(f'Unknown strip name {name}')
+        return handle
+
+    def set_frame(self, group_handle, duties):
+        """Set brightness of all leds of a group, repainted once."""
+        handles = self._groups[group_handle]
+        if isinstance(handles, Strip):
+            # sent by the next flush
+            handles.set_frame(duties)
+            return
+
+        led_groups = set()
+        self._ramps.written_frame(handles, duties)
+        for index, handle in enumerate(handles):
+            if handle is not None:
+                led_groups.add(self._set_color(handle,
+                                               duties[index] / MAX_DUTY))
+        for led_group in led_groups:
+            self._colors[led_group]['status'] = True
+
+    def flush(self):
+        """Send strips changed since the last flush to the window."""
+        for strip, _window in self._strips:
+            strip.flush()
+
+    def set_led_brightness(self, handle, brightness):
+        """Set led brightness based on its handle."""
+        led_group = self._set_color(handle, brightness)
+        self._colors[led_group]['status'] = True
+
+    def set_led_duty(self, handle, duty):
+        """Set led brightness from a 0..65535 PWM duty."""
+        self._ramps.written(handle, duty)
+        self._write_duty(handle, duty)
+
+    def ramp_led_duty(self, handle, duty, duration):
+        """Ramp a led from its current duty to a 0..65535 one in ms."""
+        self._ramps.start(handle, duty, duration)
+
+    def _write_duty(self, handle, duty):
+        self.set_led_brightness(handle, duty / MAX_DUTY)
+
+    def _set_color(self, handle, brightness):
+        """Set a led color, return its group to be repainted."""
+        led_group, name = self._channels[handle]
+        self._colors[led_group]['leds'][name] = (
+            self._get_tinted_html_color(self._colors[led_group]['color'],
+                                        brightness))
+        # LOG.debug(f'{led_group} {name} was set to {brightness}')
+        return led_group
 
     def get_light_sensor(self):
         return float(self._light_scale_value.get())
@@ -113,6 +225,18 @@ class Emulator:
     def get_button_state(self):
         return self._button_pressed
 
+    def set_button_handler(self, handler):
+        """Call handler(pin) on button clicks and releases."""
+        self._button_handler = handler
+
+    def get_button_edges(self):
+        """Return the buffer of timestamped button edges."""
+        return self._button_edges
+
+    def set_timing_source(self, source):
+        """Show the text returned by source() live in the window."""
+        self._timing_source = source
+
     def _create_window(self):
         """Create a window and frames."""
         self._root = Tk()
@@ -139,15 +263,29 @@ class Emulator:
                 call_map[led_group]()
                 self._colors[led_group]['status'] = False
 
+        for index, (_strip, window) in enumerate(self._strips):
+            if window.updated:
+                window.updated = False
+                self._draw_strip(index, window)
+
+        if self._timing_source:
+            self._timing_text.set(self._timing_source())
+
         self._root.after(100, self._update_lights)
 
     def _button_click(self, _event):
         # LOG.debug('Button click')
         self._button_pressed = True
+        self._button_edges.push(ticks_ms(), True)
+        if self._button_handler:
+            self._button_handler(None)
 
     def _button_release(self, _event):
         # LOG.debug('Button release')
         self._button_pressed = False
+        self._button_edges.push(ticks_ms(), False)
+        if self._button_handler:
+            self._button_handler(None)
 
     # Hardcoded drawing functions
 
@@ -186,6 +324,21 @@ class Emulator:
                                            height=self._status_light_height)
         self._status_light_canvas.pack()
 
+        self._strip_canvases = []
+        if self._strips:
+            self._strip_frame = Frame(master=self._root,
+                                      width=self._window_width // 2,
+                                      height=self._window_height,
+                                      bg='grey')
+            self._strip_frame.pack(padx=30, side=LEFT)
+            self._add_label(self._strip_frame, 'Strips')
+            for strip, _window in self._strips:
+                canvas = Canvas(self._strip_frame,
+                                width=self._pixel_size * strip.pixel_count,
+                                height=self._pixel_size)
+                canvas.pack(pady=5)
+                self._strip_canvases.append(canvas)
+
         self._light_sensor_frame = Frame(master=self._root,
                                          width=self._window_width // 2,
                                          height=self._window_height,
@@ -218,6 +371,15 @@ class Emulator:
         self._button_element.bind("<ButtonRelease>", self._button_release)
         self._button_element.pack()
 
+        self._timing_frame = Frame(master=self._root, bg='grey')
+        self._timing_frame.pack(padx=30, side=LEFT)
+        self._add_label(self._timing_frame, 'Timings')
+        self._timing_text = StringVar()
+        Label(self._timing_frame,
+              textvariable=self._timing_text,
+              justify=LEFT,
+              font='TkFixedFont').pack()
+
     def _add_label(self, parent, text):
         label = Label(parent, text=text)
         label.pack(fill='both')
@@ -278,6 +440,16 @@ class Emulator:
             outline='black',
             fill=self._colors['tail']['leds']['tail_4'])
 
+    def _draw_strip(self, index, window):
+        """Draw pixels of a strip in a row."""
+        canvas = self._strip_canvases[index]
+        size = self._pixel_size
+        for pixel, color in enumerate(window.get_html_colors()):
+            canvas.create_rectangle(pixel * size, 0,
+                                    (pixel + 1) * size, size,
+                                    outline='black',
+                                    fill=color)
+
     def _draw_status_light(self):
         """Draw a status LED."""
         led_radius = self._status_light_width // 8
@@ -302,12 +474,52 @@ class BoardInterface:
         self._board = board
         for _set_name, set_params in config['leds'].items():
             for name, params in set_params['leds'].items():
-                self._board.set_led_brightness(name, self.DEFAULT_BRIGHTNESS)
-
-    def change_brightness(self, name, brightness):
+                handle = self._board.get_led_handle(name)
+                if handle is not None:
+                    self._board.set_led_brightness(handle,
+                                                   self.DEFAULT_BRIGHTNESS)
+
+        # strips showing the frames of led groups
+        self._group_strips = {}
+        for name, params in config.get('strips', {}).items():
+            if 'group' in params:
+                self._group_strips[params['group']] = name
+
+    def get_led_handle(self, name):
+        """Resolve a led name once, writes are done by its handle."""
+        return self._board.get_led_handle(name)
+
+    def add_led_group(self, handles):
+        """Resolve a led group once, frames are written by its handle."""
+        return self._board.add_led_group(handles)
+
+    def get_strip_handle(self, name):
+        """Resolve a strip once, frames are written by its handle."""
+        return self._board.get_strip_handle(name)
+
+    def get_group_strip(self, led_type):
+        """Return a handle of a strip showing a led group or None."""
+        name = self._group_strips.get(led_type)
+        if name is None:
+            return None
+        return self._board.get_strip_handle(name)
+
+    def set_frame(self, group_handle, duties):
+        """Change brightness of all leds of a group in the window."""
+        self._board.set_frame(group_handle, duties)
+
+    def flush(self):
+        """Send buffered frames out, once per tick."""
+        self._board.flush()
+
+    def change_duty(self, handle, duty):
         """Change brightness for a led element in the window."""
-        # LOG.debug(f' Board IF: {name} brightness: {brightness}')
-        self._board.set_led_brightness(name, brightness)
+        # LOG.debug(f' Board IF: {handle} duty: {duty}')
+        self._board.set_led_duty(handle, duty)
+
+    def ramp_duty(self, handle, duty, duration):
+        """Ramp a led element in the window to a duty in ms."""
+        self._board.ramp_led_duty(handle, duty, duration)
 
     def get_light_sensor(self):
         """Get the value of a light sensor slider in the window."""
@@ -315,3 +527,11 @@ class BoardInterface:
 
     def get_button_state(self):
         return self._board.get_button_state()
+
+    def set_button_handler(self, handler):
+        """Call handler(pin) on button clicks and releases."""
+        self._board.set_button_handler(handler)
+
+    def get_button_edges(self):
+        """Return the buffer of timestamped button edges."""
+        return self._board.get_button_edges()
@@ -57,6 +57,14 @@ BOARD_CONFIG = {
             }
         }
     },
+    'strips': {
+        'tail_strip': {
+            'pin': 11,
+            'pixels': 16,
+            'color': (255, 0, 0),
+            'group': 'tail',
+        },
+    },
     'sensors': {
         'light': {
             'pin': 10
@@ -149,13 +157,14 @@ def modify_state(original_state, animated=False, single_click=False):
     return state
 
 
-EMULATOR = Emulator()
+EMULATOR = Emulator(BOARD_CONFIG['strips'])
 BOARD = BoardInterface(EMULATOR, BOARD_CONFIG)
 
 
 async def control_module_clear_start():
     state = generate_default_state()
     control_module = ControlModule(BOARD, state)
+    EMULATOR.set_timing_source(control_module.timing_report)
     await control_module.start()
 
 
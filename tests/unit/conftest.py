@@ -1,6 +1,128 @@
+import asyncio
+import copy
 import sys
+import threading
 from os.path import abspath, dirname
 
+import pytest
+
 # Testing current sources
 PACKAGE_DIR = dirname(dirname(dirname(abspath(__file__))))
 sys.path.insert(0, PACKAGE_DIR)
+
+from pico_copilot.board.config import BOARD_CONFIG  # noqa: E402
+from pico_copilot.board.edges import EdgeBuffer  # noqa: E402
+from pico_copilot.board.state import STATE  # noqa: E402
+from pico_copilot.modules.board_interface import (  # noqa: E402
+    BoardInterface,
+)
+from pico_copilot.modules.control import ControlModule  # noqa: E402
+
+
+class VirtualClock:
+    """Monotonic ms clock advanced only by the sleeps of the loop."""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, ms):
+        self.now += ms
+        await asyncio.sleep(0)
+
+
+class EdgeBoard:
+    """Board stand-in with a button pin firing edge interrupts."""
+
+    def __init__(self, clock):
+        self.pressed = False
+        self.handler = None
+        self.edges = EdgeBuffer()
+        self._clock = clock
+        self.duties = {}
+        self._groups = []
+        # writes per kind and the threads frames are written from
+        self.frame_writes = 0
+        self.led_writes = 0
+        self.frame_threads = set()
+        # leds which are not on the board, resolved names, ramped leds
+        self.missing = set()
+        self.resolved = []
+        self.ramps = []
+        # the last frame of every strip
+        self.strip_frames = {}
+
+    def set_button(self, pressed):
+        self.pressed = pressed
+        self.edges.push(self._clock(), pressed)
+        self.handler(None)
+
+    def set_button_handler(self, handler):
+        self.handler = handler
+
+    def get_button_state(self):
+        return self.pressed
+
+    def get_button_edges(self):
+        return self.edges
+
+    def get_light_sensor(self):
+        return 0.5
+
+    def get_led_handle(self, name):
+        self.resolved.append(name)
+        if name in self.missing:
+            return None
+        return name
+
+    def get_group_strip(self, led_type):
+        return None
+
+    def get_strip_handle(self, name):
+        self._groups.append(name)
+        return len(self._groups) - 1
+
+    def add_led_group(self, handles):
+        self._groups.append(handles)
+        return len(self._groups) - 1
+
+    def set_frame(self, group, duties):
+        self.frame_writes += 1
+        self.frame_threads.add(threading.get_ident())
+        group = self._groups[group]
+        if isinstance(group, str):
+            self.strip_frames[group] = list(duties)
+            return
+        for handle, duty in zip(group, duties):
+            if handle is not None:
+                self.duties[handle] = duty
+
+    def set_led_duty(self, handle, duty):
+        self.led_writes += 1
+        self.duties[handle] = duty
+
+    def ramp_led_duty(self, handle, duty, duration):
+        self.ramps.append(handle)
+        self.duties[handle] = duty
+
+    def flush(self):
+        pass
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock()
+
+
+@pytest.fixture
+def board(clock):
+    return EdgeBoard(clock)
+
+
+@pytest.fixture
+def control(board, clock):
+    """Single core control module on the virtual clock."""
+    return ControlModule(BoardInterface(board, BOARD_CONFIG),
+                         copy.deepcopy(STATE), clock, clock.sleep)
@@ -0,0 +1,133 @@
+import builtins
+import gc
+import sys
+
+from pico_copilot.modules.modes import NormalMode
+
+# the board has small ints, the host boxes ints above 256, so counters
+# and clock values held between ticks keep a few of them allocated
+HOST_INT_BYTES = 128
+# and short lived ones are allowed within a tick. Small dicts and
+# lists are reused by the host without malloc, only the board catches
+# them, the host catches them only if they are kept.
+HOST_TICK_BUDGET = 512
+TICK_MS = 10
+TICKS = 300
+
+
+def tick_allocations(tick, ticks):
+    """Return the most bytes allocated during a single tick."""
+    if hasattr(gc, 'mem_alloc'):
+        most = 0
+        for _ in range(ticks):
+            gc.collect()
+            before = gc.mem_alloc()
+            tick()
+            most = max(most, gc.mem_alloc() - before)
+        return most
+
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        # tracemalloc sets itself up during the first one
+        tick()
+        most = 0
+        for _ in range(ticks):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            tick()
+            most = max(most, tracemalloc.get_traced_memory()[1] - before)
+        return most
+    finally:
+        tracemalloc.stop()
+
+
+def net_allocations(tick, ticks):
+    """Return (bytes, objects) left allocated by ticks."""
+    if hasattr(gc, 'mem_alloc'):
+        # without collecting, anything allocated is counted
+        gc.collect()
+        gc.disable()
+        before = gc.mem_alloc()
+        for _ in range(ticks):
+            tick()
+        allocated = gc.mem_alloc() - before
+        gc.enable()
+        return allocated, 0
+
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        # ints held between ticks are traced only once replaced
+        for _ in range(ticks):
+            tick()
+        gc.collect()
+        objects = len(gc.get_objects())
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(ticks):
+            tick()
+        gc.collect()
+        allocated = tracemalloc.get_traced_memory()[0] - before
+        return allocated, len(gc.get_objects()) - objects
+    finally:
+        tracemalloc.stop()
+
+
+def create_ticks(control, clock):
+    """Switch to the normal mode, return a function doing a tick."""
+    control._update_mode(NormalMode(control._state))
+
+    def tick():
+        clock.now += TICK_MS
+        control._process_tick()
+
+    # animations and lookups are set up by the first ticks
+    for _ in range(100):
+        tick()
+    return tick
+
+
+def test_normal_mode_tick_does_not_allocate(control, clock):
+    tick = create_ticks(control, clock)
+    budget = 0 if hasattr(gc, 'mem_alloc') else HOST_TICK_BUDGET
+    # the sensor is read once a second
+    assert tick_allocations(tick, TICKS) <= budget
+
+
+def test_normal_mode_ticks_keep_nothing_allocated(control, clock):
+    tick = create_ticks(control, clock)
+    allocated, objects = net_allocations(tick, TICKS)
+    assert objects <= 0
+    budget = 0 if hasattr(gc, 'mem_alloc') else HOST_INT_BYTES
+    assert allocated <= budget
+
+
+
+# builtins returning a new iterator or container, the host reuses
+# their memory so the budgets above do not see them
+ALLOCATING_BUILTINS = ('enumerate', 'zip', 'map', 'filter', 'reversed',
+                       'sorted', 'list', 'tuple', 'dict', 'set')
+
+
+def test_normal_mode_ticks_call_no_allocating_builtins(control, clock,
+                                                      monkeypatch):
+    tick = create_ticks(control, clock)
+    called = []
+
+    def counted(name, function):
+        def call(*args, **kwargs):
+            # the board stand-in is not on the device
+            caller = sys._getframe(1).f_code
+            if 'pico_copilot' in caller.co_filename:
+                called.append(f'{name} in {caller.co_name}')
+            return function(*args, **kwargs)
+        return call
+
+    for name in ALLOCATING_BUILTINS:
+        monkeypatch.setattr(builtins, name,
+                            counted(name, getattr(builtins, name)))
+    # animations repeat within these ticks
+    for _ in range(TICKS * 2):
+        tick()
+    monkeypatch.undo()
+    assert called == []
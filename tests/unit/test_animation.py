@@ -0,0 +1,120 @@
+from pico_copilot.modules.animations.animation import Animation
+from pico_copilot.modules.animations.cache import ANIMATION_CACHE
+from pico_copilot.modules.animations.timeline import compile_timeline
+
+TICK_LENGTH = 0.01
+NAME = 'test_steps'
+# a step every 10 ms, the first keyframe is shown from the start
+STEPS = compile_timeline([[(0.0, 0.0)] +
+                          [(0.01, step / 10) for step in range(1, 11)]])
+
+
+def create_animation(clock):
+    ANIMATION_CACHE.put(NAME, TICK_LENGTH, STEPS)
+    return Animation(NAME, TICK_LENGTH, clock)
+
+
+def step(frame):
+    return list(STEPS.brightness).index(frame[0])
+
+
+def test_frames_on_time_skip_nothing(clock):
+    animation = create_animation(clock)
+    for expected in range(1, 6):
+        assert step(animation.generate_frame()) == expected
+        assert animation.skipped == 0
+        clock.now += 10
+    assert animation.skipped_total == 0
+
+
+def test_late_frame_is_sampled_at_the_clock_and_counts_skips(clock):
+    animation = create_animation(clock)
+    animation.generate_frame()
+
+    clock.now = 40
+    # the frames of 10, 20 and 30 ms were missed
+    assert step(animation.generate_frame()) == 5
+    assert animation.skipped == 3
+
+    clock.now = 50
+    assert step(animation.generate_frame()) == 6
+    assert animation.skipped == 0
+    assert animation.skipped_total == 3
+
+
+def test_clock_starts_with_the_first_frame(clock):
+    animation = create_animation(clock)
+    clock.now = 1000
+    assert step(animation.generate_frame()) == 1
+    assert animation.skipped == 0
+
+
+def test_late_frames_finish_on_time(clock):
+    animation = create_animation(clock)
+    animation.generate_frame()
+    clock.now = 95
+    assert step(animation.generate_frame()) == 10
+    assert not animation.finished
+
+    clock.now = 130
+    assert step(animation.generate_frame()) == 10
+    assert animation.finished
+    assert animation.skipped_total == 8 + 2
+
+
+def test_reset_restarts_the_clock_and_keeps_the_total(clock):
+    animation = create_animation(clock)
+    animation.generate_frame()
+    clock.now = 30
+    animation.generate_frame()
+    animation.reset()
+
+    clock.now = 500
+    assert step(animation.generate_frame()) == 1
+    assert animation.skipped == 0
+    assert animation.skipped_total == 2
+
+
+def columns(timeline):
+    return [list(column) for column in (timeline.durations,
+                                        timeline.brightness,
+                                        timeline.offsets)]
+
+
+def test_playback_does_not_change_the_shared_timeline(clock):
+    animation = create_animation(clock)
+    before = columns(STEPS)
+    for _ in range(3):
+        while not animation.finished:
+            animation.generate_frame()
+            clock.now += 10
+        animation.reset()
+    assert columns(STEPS) == before
+
+
+def test_animations_share_one_timeline(clock):
+    first = create_animation(clock)
+    second = Animation(NAME, TICK_LENGTH, clock)
+    assert first._timeline is STEPS
+    assert second._timeline is STEPS
+
+    first.generate_frame()
+    clock.now = 50
+    assert step(first.generate_frame()) == 6
+    # each animation has its own cursors and clock
+    assert step(second.generate_frame()) == 1
+
+
+def test_reset_rewinds_only_the_cursors(clock):
+    animation = create_animation(clock)
+    for _ in range(5):
+        animation.generate_frame()
+        clock.now += 10
+    cursors = list(animation._cursors)
+    assert cursors[0].index
+
+    animation.reset()
+    assert animation._timeline is STEPS
+    assert all(new is old for new, old in zip(animation._cursors, cursors))
+    assert cursors[0].index == 0
+    assert not cursors[0].finished
@@ -0,0 +1,121 @@
+import copy
+
+from pico_copilot.board.edges import EdgeBuffer
+from pico_copilot.board.state import STATE
+from pico_copilot.modules.button import ButtonModule
+from pico_copilot.modules.state import State
+
+
+def create_button(board, clock):
+    state = State(copy.deepcopy(STATE))
+    button = ButtonModule(board, state, 'button1', 0.01, clock)
+    return button, board.edges, state
+
+
+def events(state):
+    return [event for event in ('single_click', 'double_click', 'long_click')
+            if state.retrieve_button_event('button1', event)]
+
+
+def update(button, clock, now):
+    clock.now = now
+    button.update()
+
+
+def push_clicks(edges, *clicks):
+    for pressed_time, released_time in clicks:
+        edges.push(pressed_time, True)
+        edges.push(released_time, False)
+
+
+def test_single_click_waits_for_the_double_click_delay(board, clock):
+    button, edges, state = create_button(board, clock)
+    push_clicks(edges, (1000, 1100))
+    update(button, clock, 1150)
+    assert events(state) == []
+    assert button.updates_available
+
+    update(button, clock, 1301)
+    assert events(state) == ['single_click']
+    assert not button.updates_available
+
+
+def test_double_click_within_a_single_update(board, clock):
+    button, edges, state = create_button(board, clock)
+    push_clicks(edges, (1000, 1050), (1150, 1200))
+    update(button, clock, 5000)
+    assert events(state) == ['double_click']
+
+
+def test_late_second_click_is_two_single_clicks(board, clock):
+    button, edges, state = create_button(board, clock)
+    push_clicks(edges, (1000, 1050), (1300, 1350))
+    update(button, clock, 1360)
+    assert events(state) == ['single_click']
+    update(button, clock, 1600)
+    assert events(state) == ['single_click']
+
+
+def test_long_click_is_reported_while_pressed(board, clock):
+    button, edges, state = create_button(board, clock)
+    edges.push(1000, True)
+    update(button, clock, 2990)
+    assert events(state) == []
+    update(button, clock, 3000)
+    assert events(state) == ['long_click']
+
+    edges.push(4000, False)
+    update(button, clock, 5000)
+    assert events(state) == []
+
+
+def test_long_click_is_timed_by_edges_not_updates(board, clock):
+    button, edges, state = create_button(board, clock)
+    push_clicks(edges, (1000, 3500))
+    update(button, clock, 9000)
+    assert events(state) == ['long_click']
+
+
+def test_bounces_are_ignored(board, clock):
+    button, edges, state = create_button(board, clock)
+    push_clicks(edges, (1000, 1005))
+    edges.push(1006, False)
+    update(button, clock, 2000)
+    assert events(state) == []
+
+
+def test_button_is_resynced_after_lost_edges(board, clock):
+    button, edges, state = create_button(board, clock)
+    # bouncing fills the buffer, the final release is dropped
+    for time in range(1000, 1020):
+        edges.push(time, time % 2 == 0)
+    board.pressed = False
+    assert edges.dropped
+    update(button, clock, 1100)
+    assert events(state) == []
+    assert not button.updates_available
+
+    update(button, clock, 5000)
+    assert events(state) == []
+
+
+def test_button_held_through_lost_edges_long_clicks(board, clock):
+    button, edges, state = create_button(board, clock)
+    for time in range(1000, 1021):
+        edges.push(time, time % 2 == 1)
+    board.pressed = True
+    update(button, clock, 1100)
+    update(button, clock, 3099)
+    assert events(state) == []
+    update(button, clock, 3100)
+    assert events(state) == ['long_click']
+
+
+def test_full_edge_buffer_drops_new_edges():
+    edges = EdgeBuffer(4)
+    for time in range(5):
+        edges.push(time, time % 2 == 0)
+    assert len(edges) == 3
+    assert edges.dropped == 2
+    assert [edges.pop(), edges.pop(), edges.pop(), edges.pop()] == [
+        (0, True), (1, False), (2, True), None]
@@ -0,0 +1,88 @@
+from pico_copilot.modules.animations.cache import AnimationCache
+
+
+class Entry:
+    """Cached timeline stand-in."""
+
+    def __init__(self, keyframes):
+        self.keyframes = keyframes
+
+
+def keys(cache):
+    return [name for name, _tick in cache._order]
+
+
+def test_least_recently_used_are_evicted_by_keyframes():
+    cache = AnimationCache(max_keyframes=100)
+    cache.put('a', 0.01, Entry(40))
+    cache.put('b', 0.01, Entry(40))
+    # a is used again, b is the least recently used one
+    cache.get('a', 0.01)
+    cache.put('c', 0.01, Entry(40))
+
+    assert keys(cache) == ['a', 'c']
+    assert cache.evictions == 1
+    assert cache.stats()['keyframes'] == 80
+
+
+def test_evictions_free_enough_keyframes():
+    cache = AnimationCache(max_keyframes=100)
+    for name in 'abcd':
+        cache.put(name, 0.01, Entry(25))
+    cache.put('e', 0.01, Entry(60))
+
+    assert keys(cache) == ['d', 'e']
+    assert cache.evictions == 3
+
+
+def test_entry_over_the_budget_is_kept_alone():
+    cache = AnimationCache(max_keyframes=100)
+    cache.put('a', 0.01, Entry(10))
+    cache.put('b', 0.01, Entry(150))
+
+    assert keys(cache) == ['b']
+
+
+def test_replaced_entry_is_accounted_once():
+    cache = AnimationCache(max_keyframes=100)
+    cache.put('a', 0.01, Entry(40))
+    cache.put('a', 0.01, Entry(50))
+
+    assert keys(cache) == ['a']
+    assert cache.stats()['keyframes'] == 50
+
+
+def test_tick_length_is_a_part_of_the_key():
+    cache = AnimationCache()
+    first = cache.get('startup', 0.01)
+    other = cache.get('startup', 0.02)
+
+    assert first is not other
+    assert cache.get('startup', 0.01) is first
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_hits_and_misses():
+    cache = AnimationCache()
+    timeline = cache.get('normal', 0.01)
+    assert cache.get('normal', 0.01) is timeline
+    assert cache.get('normal', 0.01) is timeline
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (2, 1)
+    assert stats['entries'] == 1
+    assert stats['keyframes'] == timeline.keyframes
+
+
+def test_clear_keeps_the_counters():
+    cache = AnimationCache()
+    cache.get('normal', 0.01)
+    cache.get('normal', 0.01)
+    cache.clear()
+
+    stats = cache.stats()
+    assert (stats['entries'], stats['keyframes']) == (0, 0)
+    assert (stats['hits'], stats['misses']) == (1, 1)
+    # loaded again after clearing
+    cache.get('normal', 0.01)
+    assert cache.misses == 2
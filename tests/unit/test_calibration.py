@@ -0,0 +1,74 @@
+import pytest
+
+from pico_copilot.board.calibration import (
+    LUT_SIZE,
+    compile_lut,
+    lut_duty,
+)
+from pico_copilot.utils.fixed import MAX_DUTY
+
+CALIBRATIONS = [
+    {},
+    {'gamma': 2.2},
+    {'gamma': 0.5},
+    {'perceptual': True},
+    {'gamma': 2.2, 'min_duty': 2000, 'max_duty': 50000},
+    {'perceptual': True, 'min_duty': 300, 'max_duty': 60000},
+]
+
+
+def duties(calibration):
+    lut = compile_lut(calibration)
+    return [lut_duty(lut, duty) for duty in range(MAX_DUTY + 1)]
+
+
+@pytest.mark.parametrize('calibration', CALIBRATIONS)
+def test_ends_of_the_duty_range(calibration):
+    values = duties(calibration)
+    assert values[0] == 0
+    assert values[MAX_DUTY] == calibration.get('max_duty', MAX_DUTY)
+    assert max(values) == values[MAX_DUTY]
+
+
+@pytest.mark.parametrize('calibration', CALIBRATIONS)
+def test_calibrated_duties_are_monotonic(calibration):
+    values = duties(calibration)
+    assert values == sorted(values)
+
+
+def test_linear_calibration_keeps_duties():
+    values = duties({})
+    assert all(abs(value - duty) <= 1 for duty, value in enumerate(values))
+
+
+def test_gamma():
+    lut = compile_lut({'gamma': 2.2})
+    assert len(lut) == LUT_SIZE
+    for duty in (4096, 16384, 32768, 49152):
+        expected = (duty / MAX_DUTY) ** 2.2 * MAX_DUTY
+        assert lut_duty(lut, duty) == pytest.approx(expected, rel=0.01)
+
+
+def test_min_duty_is_the_first_step():
+    lut = compile_lut({'gamma': 2.2, 'min_duty': 2000})
+    # off stays off, every other duty is visible
+    assert lut_duty(lut, 0) == 0
+    assert all(lut_duty(lut, duty) >= 2000 for duty in range(1, 257))
+    assert lut_duty(lut, 1) == 2000
+
+
+def test_dim_duties_are_interpolated():
+    values = duties({'gamma': 2.2})
+    # a table lookup alone had 16 steps there, now no PWM duty is skipped
+    assert len(set(values[:4096])) == values[4095] + 1
+
+
+@pytest.mark.parametrize('calibration', [
+    {'min_duty': -1},
+    {'max_duty': MAX_DUTY + 1},
+    {'min_duty': 1000, 'max_duty': 999},
+    {'gamma': 0},
+])
+def test_invalid_calibration(calibration):
+    with pytest.raises(ValueError):
+        compile_lut(calibration)
@@ -0,0 +1,80 @@
+from struct import pack_into, unpack_from
+
+import pytest
+
+from pico_copilot.modules.animations.compiler import main
+from pico_copilot.modules.animations.loader import (
+    HEADER_FORMAT,
+    Loader,
+    read_animations,
+)
+
+TICK_LENGTH = 0.01
+
+
+@pytest.fixture
+def compiled(tmp_path):
+    path = str(tmp_path / 'led_animations.bin')
+    assert main(['--tick', str(TICK_LENGTH), '--output', path]) == 0
+    return path
+
+
+def columns(timeline):
+    return (list(timeline.offsets), list(timeline.durations),
+            list(timeline.brightness), timeline.length, timeline.curve)
+
+
+def test_compiled_timelines_equal_the_json_ones(compiled):
+    played = 0
+    for name in read_animations():
+        loader = Loader(name, TICK_LENGTH, compiled_path=compiled)
+        source = Loader(name, TICK_LENGTH, compiled=False)
+        if source.timeline is None:
+            # procedural animations are not compiled
+            assert loader.generator is not None
+            continue
+        # the JSON rows are kept only when loaded from JSON
+        assert loader.animation is None
+        assert columns(loader.timeline) == columns(source.timeline)
+        played += 1
+    assert played
+
+
+def test_other_tick_length_is_loaded_from_json(compiled):
+    loader = Loader('startup', 0.02, compiled_path=compiled)
+    assert loader.animation is not None
+
+
+def test_stale_compiled_file_is_not_loaded(compiled):
+    with open(compiled, 'rb') as file:
+        content = bytearray(file.read())
+    # compiled from another JSON
+    header = list(unpack_from(HEADER_FORMAT, content))
+    header[-1] ^= 1
+    pack_into(HEADER_FORMAT, content, 0, *header)
+    with open(compiled, 'wb') as file:
+        file.write(content)
+
+    loader = Loader('startup', TICK_LENGTH, compiled_path=compiled)
+    assert loader.animation is not None
+
+
+def test_missing_compiled_file_falls_back_to_json(tmp_path):
+    loader = Loader('startup', TICK_LENGTH,
+                    compiled_path=str(tmp_path / 'missing.bin'))
+    assert loader.animation is not None
+
+
+def test_report_passes_within_the_budget(capsys):
+    assert main(['--report']) == 0
+    assert 'error' not in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('budget', [
+    ['--max-keyframes', '1'],
+    ['--max-ram', '1'],
+    ['--max-frame-us', '0.001'],
+])
+def test_report_fails_over_the_budget(budget, capsys):
+    assert main(['--report'] + budget) == 1
+    assert 'error' in capsys.readouterr().out
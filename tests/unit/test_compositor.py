@@ -0,0 +1,106 @@
+from array import array
+
+import pytest
+
+from pico_copilot.modules.animations.compositor import Compositor
+from pico_copilot.utils.fixed import MAX_DUTY
+
+
+class Frames:
+    """Animation stand-in playing a list of single led frames."""
+
+    def __init__(self, values):
+        self._values = values
+        self._index = 0
+        self.finished = False
+
+    def reset(self):
+        self._index = 0
+        self.finished = False
+
+    def generate_frame(self):
+        value = self._values[self._index]
+        self._index += 1
+        self.finished = self._index == len(self._values)
+        return array('H', [value])
+
+
+def hold(value):
+    return Frames([value] * 1000)
+
+
+@pytest.mark.parametrize('blend, alpha, value, expected', [
+    ('replace', 1.0, 20000, 20000),
+    ('replace', 0.5, 20000, 30000),
+    ('replace', 0.0, 20000, 40000),
+    ('max', 1.0, 20000, 40000),
+    ('max', 1.0, 60000, 60000),
+    ('max', 0.5, 60000, 40000),
+    ('add', 1.0, 20000, 60000),
+    ('add', 1.0, 60000, MAX_DUTY),
+    ('add', 0.5, 20000, 50000),
+    ('multiply', 1.0, 32768, 20000),
+    ('multiply', 0.5, 32768, 30000),
+    ('multiply', 0.0, 32768, 40000),
+    ('multiply', 1.0, 0, 0),
+])
+def test_blend_modes(blend, alpha, value, expected):
+    compositor = Compositor(1)
+    compositor.set_layer('base', hold(40000), repeat=True)
+    compositor.set_layer('overlay', hold(value), blend=blend, alpha=alpha)
+    assert list(compositor.compose()) == [expected]
+
+
+def test_layers_are_blended_bottom_to_top():
+    compositor = Compositor(1)
+    compositor.background = 10000
+    compositor.set_layer('alert', hold(1000), blend='add')
+    compositor.set_layer('overlay', hold(40000), blend='max')
+    # max over the background first, then the alert is added
+    assert list(compositor.compose()) == [41000]
+
+
+def test_finished_overlay_resumes_the_base_where_it_is():
+    compositor = Compositor(1)
+    compositor.set_layer('base', Frames(list(range(1, 10))))
+    compositor.set_layer('overlay', Frames([100, 200]))
+
+    assert list(compositor.compose()) == [100]
+    # the last overlay frame is shown once
+    assert list(compositor.compose()) == [200]
+    assert compositor.has_overlays()
+    # the base kept playing while covered
+    assert list(compositor.compose()) == [3]
+    assert not compositor.has_overlays()
+
+
+def test_removed_overlay_resumes_the_base_where_it_is():
+    compositor = Compositor(1)
+    compositor.set_layer('base', Frames(list(range(1, 10))))
+    compositor.set_layer('overlay', hold(100), repeat=True)
+    compositor.compose()
+    compositor.compose()
+
+    compositor.remove_layer('overlay')
+    assert list(compositor.compose()) == [3]
+
+
+def test_finished_base_holds_its_last_frame():
+    compositor = Compositor(1)
+    compositor.set_layer('base', Frames([1, 2]))
+    compositor.compose()
+    assert compositor.active()
+    compositor.compose()
+
+    assert not compositor.active()
+    assert list(compositor.compose()) == [2]
+
+
+def test_repeated_layer_restarts():
+    compositor = Compositor(1)
+    compositor.set_layer('base', Frames([1, 2]), repeat=True)
+    frames = [compositor.compose()[0] for _ in range(5)]
+
+    assert frames == [1, 2, 1, 2, 1]
+    assert compositor.get_layer('base').cycles == 2
+    assert compositor.active()
@@ -0,0 +1,62 @@
+import asyncio
+
+from pico_copilot.modules.modes import PoweroffMode
+
+
+async def run_for(clock, ms):
+    """Let the loop run for ms of the virtual clock or until it idles."""
+    deadline = clock.now + ms
+    # a tick is a virtual sleep of at least a ms
+    for _ in range(10 * ms):
+        if clock.now >= deadline:
+            return
+        await asyncio.sleep(0)
+
+
+async def settle():
+    """Let the loop run without advancing the virtual clock."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_poweroff_idles_until_a_button_edge(control, board, clock):
+    async def scenario():
+        task = asyncio.create_task(control.start())
+
+        board.set_button(True)
+        await run_for(clock, 2500)
+        board.set_button(False)
+        # the double click delay passes, then nothing is left to do
+        await run_for(clock, 1000)
+        assert isinstance(control._mode, PoweroffMode)
+        assert clock.now < 2500 + 1000
+
+        wakeups = control.wakeups
+        await settle()
+        assert control.wakeups == wakeups
+
+        board.set_button(True)
+        await settle()
+        assert control.wakeups > wakeups
+
+        task.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_external_event_wakes_the_loop(control, board, clock):
+    async def scenario():
+        task = asyncio.create_task(control.start())
+        board.set_button(True)
+        await run_for(clock, 2500)
+        board.set_button(False)
+        await run_for(clock, 1000)
+
+        wakeups = control.wakeups
+        control.wake()
+        await settle()
+        assert control.wakeups == wakeups + 1
+
+        task.cancel()
+
+    asyncio.run(scenario())
@@ -0,0 +1,148 @@
+import copy
+
+from pico_copilot.board.config import BOARD_CONFIG
+from pico_copilot.board.state import STATE
+from pico_copilot.modules.animations.cache import ANIMATION_CACHE
+from pico_copilot.modules.animations.timeline import compile_timeline
+from pico_copilot.modules.board_interface import BoardInterface
+from pico_copilot.modules.led import LedManager
+from pico_copilot.modules.state import State
+from pico_copilot.utils.fixed import MAX_DUTY
+
+TICK_LENGTH = 0.01
+TICK_MS = 10
+# every tail led at a constant brightness for a second
+HOLD = compile_timeline([[(0.0, 0.25), (1.0, 0.25)]] * 4)
+# every tail led getting brighter on every tick, linear interpolation
+FADE = compile_timeline([[(0.0, 0.0), (1.0, 1.0)]] * 4, curve=1)
+
+
+def create_leds(board, clock, config=BOARD_CONFIG):
+    ANIMATION_CACHE.put('test_hold', TICK_LENGTH, HOLD)
+    ANIMATION_CACHE.put('test_fade', TICK_LENGTH, FADE)
+    state = State(copy.deepcopy(STATE))
+    leds = LedManager(BoardInterface(board, config), state, 'tail',
+                      TICK_LENGTH, clock)
+    # the initial brightness is written once the module is created
+    board.frame_writes = 0
+    board.led_writes = 0
+    return leds, state
+
+
+def play(leds, clock, ticks):
+    for _ in range(ticks):
+        leds.update()
+        clock.now += TICK_MS
+
+
+def test_unchanged_duties_are_not_written(board, clock):
+    leds, _state = create_leds(board, clock)
+    leds.set_animation('test_hold', 'once')
+    play(leds, clock, 20)
+
+    assert board.frame_writes == 1
+    assert leds.writes_issued == 4 + 4
+    assert leds.writes_suppressed == 19 * 4
+
+
+def test_same_brightness_is_not_written_again(board, clock):
+    leds, state = create_leds(board, clock)
+    leds.set_all_leds_brightness(0.2)
+    leds.set_all_leds_brightness(0.2)
+
+    assert board.frame_writes == 1
+    assert leds.writes_suppressed == 4
+    duty = round(0.2 * MAX_DUTY)
+    assert board.duties['tail_1'] == duty
+    assert state.get_leds_brightness('tail')['tail_1']['duty'] == duty
+
+
+def test_modifier_change_is_written(board, clock):
+    leds, _state = create_leds(board, clock)
+    leds.set_animation('test_hold', 'repeat')
+    play(leds, clock, 2)
+    leds.set_auto_brightness_modifier(0.5)
+    play(leds, clock, 2)
+
+    assert board.frame_writes == 2
+    assert board.duties['tail_1'] == round(0.25 * MAX_DUTY) // 2
+
+
+def test_a_tick_writes_the_group_once(board, clock):
+    leds, _state = create_leds(board, clock)
+    leds.set_animation('test_fade', 'once')
+    for tick in range(1, 11):
+        leds.update()
+        clock.now += TICK_MS
+        assert board.frame_writes == tick
+    assert leds.writes_issued == 4 + 10 * 4
+    assert board.led_writes == 0
+
+
+def test_a_brightness_change_writes_the_group_once(board, clock):
+    leds, _state = create_leds(board, clock)
+    leds.set_all_leds_brightness(0.3)
+
+    assert board.frame_writes == 1
+    assert board.led_writes == 0
+    assert [board.duties[f'tail_{led}'] for led in range(1, 5)] == (
+        [round(0.3 * MAX_DUTY)] * 4)
+
+
+def test_state_brightness_is_the_static_level(board, clock):
+    leds, state = create_leds(board, clock)
+    leds.set_all_leds_brightness(0.3)
+    leds.set_animation('test_fade', 'once')
+    play(leds, clock, 50)
+
+    tail = state.get_leds_brightness('tail')['tail_1']
+    # animations change the duty only
+    assert tail['brightness'] == 0.3
+    assert tail['duty'] == board.duties['tail_1']
+    assert tail['duty'] != round(0.3 * MAX_DUTY)
+
+    leds.fade_all_leds(0.6, 1.0)
+    assert state.get_leds_brightness('tail')['tail_1']['brightness'] == 0.6
+
+
+def test_led_names_are_resolved_once(board, clock):
+    leds, _state = create_leds(board, clock)
+    resolved = len(board.resolved)
+    leds.set_animation('test_fade', 'repeat')
+    play(leds, clock, 10)
+    leds.set_all_leds_brightness(0.4)
+    leds.fade_all_leds(0.1, 0.5)
+
+    assert len(board.resolved) == resolved
+    # by the board interface and by the module
+    assert board.resolved.count('tail_2') == 2
+
+
+def test_missing_leds_are_skipped(board, clock):
+    board.missing.add('tail_3')
+    leds, _state = create_leds(board, clock)
+    leds.set_animation('test_fade', 'once')
+    play(leds, clock, 10)
+    leds.fade_all_leds(0.1, 0.5)
+
+    assert board.frame_writes == 10
+    assert 'tail_3' not in board.duties
+    assert None not in board.duties
+    assert board.ramps == ['tail_1', 'tail_2', 'tail_4']
+
+
+def test_group_frames_are_shown_by_its_strip(board, clock):
+    config = copy.deepcopy(BOARD_CONFIG)
+    config['strips'] = {
+        'tail_strip': {'pin': 13, 'pixels': 30, 'group': 'tail'},
+    }
+    leds, _state = create_leds(board, clock, config)
+    leds.set_animation('test_fade', 'once')
+    play(leds, clock, 10)
+    assert board.frame_writes == 2 * 10
+    assert board.strip_frames['tail_strip'] == [
+        board.duties[f'tail_{led}'] for led in range(1, 5)]
+
+    leds.fade_all_leds(0.2, 0.5)
+    assert board.strip_frames['tail_strip'] == (
+        [round(0.2 * MAX_DUTY)] * 4)
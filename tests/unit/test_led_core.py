@@ -0,0 +1,124 @@
+import asyncio
+import copy
+import threading
+import time
+
+from pico_copilot.board.config import BOARD_CONFIG
+from pico_copilot.board.state import STATE
+from pico_copilot.modules.board_interface import BoardInterface
+from pico_copilot.modules.control import ControlModule
+from pico_copilot.modules.led import LedManager
+from pico_copilot.modules.led_core import Commands, CoreState, LedCore
+from pico_copilot.modules.modes import NormalMode
+from pico_copilot.modules.state import ANIMATION_FINISHED, State
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_commands_run_in_order_on_the_led_core(board):
+    results = Commands()
+    state = CoreState(State(copy.deepcopy(STATE)), results)
+    leds = LedManager(board, state, 'tail', 0.01)
+    # leds are set to their state once they are created
+    board.frame_threads.clear()
+    core = LedCore((leds,), board, results)
+    core.start()
+
+    applied = []
+    # queued while the led core swaps buffers and runs them
+    for value in range(2000):
+        core.post(applied.append, value)
+    core.post(leds.set_animation, 'startup', 'repeat')
+    wait_for(lambda: len(applied) == 2000 and board.frame_threads)
+    core.stop()
+
+    assert applied == list(range(2000))
+    assert board.frame_threads
+    assert threading.get_ident() not in board.frame_threads
+    assert core.frames > 0
+    assert core.error is None
+
+
+def test_failed_commands_are_not_run_again():
+    commands = Commands()
+    applied = []
+    commands.post(applied.append, 1)
+    commands.post(int, 'not a number')
+    commands.post(applied.append, 2)
+    try:
+        commands.run()
+    except ValueError:
+        pass
+    commands.post(applied.append, 3)
+    commands.run()
+    assert applied == [1, 3]
+
+
+def test_state_is_changed_on_core_0(board):
+    results = Commands()
+    state = State(copy.deepcopy(STATE))
+    leds = LedManager(board, CoreState(state, results), 'tail', 0.01)
+    threads = []
+    state.subscribe(ANIMATION_FINISHED, 'tail',
+                    lambda _value: threads.append(threading.get_ident()))
+    core = LedCore((leds,), board, results)
+    core.start()
+    core.post(leds.set_all_leds_brightness, 0.25)
+    core.post(leds.set_animation, 'heartbeat', 'once')
+    wait_for(lambda: core.frames and not leds.updates_available)
+    core.stop()
+
+    tail = state.get_leds_brightness('tail')['tail_1']
+    # duties are written by the led core
+    assert tail['duty'] == board.duties['tail_1']
+    assert tail['brightness'] == 0.5
+    assert not state.get_leds_animation_finished('tail')
+    assert threads == []
+
+    results.run()
+    tail = state.get_leds_brightness('tail')['tail_1']
+    assert tail['brightness'] == 0.25
+    assert state.get_leds_animation_finished('tail')
+    assert threads == [threading.get_ident()]
+
+
+def test_led_core_errors_are_raised_on_core_0(board):
+    results = Commands()
+    state = CoreState(State(copy.deepcopy(STATE)), results)
+    core = LedCore((LedManager(board, state, 'tail', 0.01),), board, results)
+    core.start()
+    core.post(int, 'not a number')
+    wait_for(lambda: core.error is not None)
+    core.stop()
+
+    try:
+        core.check()
+    except ValueError:
+        return
+    raise AssertionError('the error was not raised')
+
+
+def test_control_module_renders_leds_on_the_led_core(board):
+    async def scenario():
+        control = ControlModule(BoardInterface(board, BOARD_CONFIG),
+                                copy.deepcopy(STATE),
+                                dual_core=True)
+        board.frame_threads.clear()
+        task = asyncio.create_task(control.start())
+        await asyncio.sleep(0.2)
+        control._update_mode(NormalMode(control._state))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(scenario())
+    assert board.frame_threads
+    assert threading.get_ident() not in board.frame_threads
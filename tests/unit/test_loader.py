@@ -0,0 +1,31 @@
+import pytest
+
+from pico_copilot.modules.animations import loader
+from pico_copilot.modules.animations.loader import Loader
+from pico_copilot.modules.animations.timeline import MAX_DURATION
+
+TICK_LENGTH = 0.01
+
+
+def animations(*keyframes):
+    return {
+        'test_long': {
+            'config': {'extend': False},
+            'data': [[(0.0, 0.0), (1.0, 1.0)], list(keyframes)],
+        },
+    }
+
+
+def test_longest_keyframe_is_loaded(monkeypatch):
+    monkeypatch.setattr(loader, 'read_animations',
+                        lambda: animations((65.535, 1.0)))
+    timeline = Loader('test_long', TICK_LENGTH, compiled=False).timeline
+    assert max(timeline.durations) == MAX_DURATION
+
+
+@pytest.mark.parametrize('led_time', [65.536, 120.0, -0.001])
+def test_keyframe_out_of_the_duration_range(monkeypatch, led_time):
+    monkeypatch.setattr(loader, 'read_animations',
+                        lambda: animations((0.0, 0.0), (led_time, 1.0)))
+    with pytest.raises(ValueError, match='test_long: led 1 keyframe'):
+        Loader('test_long', TICK_LENGTH, compiled=False)
@@ -0,0 +1,52 @@
+import threading
+
+from pico_copilot.utils.pico_logger import PicoLogger
+
+
+class RecordingLogger(PicoLogger):
+    """Logger keeping written messages instead of printing them."""
+
+    def __init__(self):
+        super().__init__('test')
+        self.lines = []
+
+    def _print(self, level, text):
+        self.lines.append(f'{level}: {text}')
+
+
+def log_from_thread(function, *args):
+    thread = threading.Thread(target=function, args=args)
+    thread.start()
+    thread.join()
+
+
+def test_other_threads_only_queue_messages():
+    logger = RecordingLogger()
+    log_from_thread(logger.info, 'from the led core')
+    assert logger.lines == []
+
+    logger.drain()
+    assert logger.lines == ['INFO: from the led core']
+
+
+def test_queued_messages_are_written_first():
+    logger = RecordingLogger()
+    log_from_thread(logger.warning, 'first')
+    logger.error('second')
+    assert logger.lines == ['WARNING: first', 'ERROR: second']
+
+
+def test_dropped_messages_are_reported():
+    logger = RecordingLogger()
+
+    def flood():
+        for index in range(40):
+            logger.debug(str(index))
+
+    log_from_thread(flood)
+    logger.drain()
+    assert logger.lines[:2] == ['DEBUG: 0', 'DEBUG: 1']
+    assert len(logger.lines) == 31 + 1
+    assert logger.lines[-1] == ('WARNING: 9 log messages of other threads '
+                                'dropped')
+
@@ -0,0 +1,30 @@
+from pico_copilot.utils.profiler import BUCKETS, Timing
+
+
+def test_min_avg_max():
+    timing = Timing('led')
+    for duration in (300, 100, 200):
+        timing.add(duration)
+    assert (timing.count, timing.min, timing.avg, timing.max) == (
+        3, 100, 200, 300)
+
+
+def test_histogram_buckets():
+    timing = Timing('led')
+    for duration in (0, BUCKETS[0], BUCKETS[0] + 1, BUCKETS[-1] + 1):
+        timing.add(duration)
+    assert timing.histogram[0] == 2
+    assert timing.histogram[1] == 1
+    assert timing.histogram[-1] == 1
+    assert sum(timing.histogram) == timing.count
+
+
+def test_reset_keeps_the_histogram():
+    timing = Timing('led')
+    histogram = timing.histogram
+    timing.add(50)
+    timing.reset()
+    assert timing.histogram is histogram
+    assert sum(histogram) == 0
+    assert timing.avg == 0
+    assert timing.summary().startswith('led: n 0 ')
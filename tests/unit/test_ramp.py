@@ -0,0 +1,138 @@
+import sys
+from threading import Event
+
+from pico_copilot.board.ramp import Ramps
+from pico_copilot.utils.timer import Timer
+
+
+class ManualTimer:
+    """machine.Timer stand-in fired by a test."""
+
+    def __init__(self):
+        self.callback = None
+        self.period = None
+
+    def init(self, mode=Timer.PERIODIC, period=-1, callback=None):
+        self.period = period
+        self.callback = callback
+
+    def deinit(self):
+        self.callback = None
+
+    def fire(self, times=1):
+        for _ in range(times):
+            if self.callback is None:
+                return
+            self.callback(self)
+
+
+def create_ramps(channels=2, period=10):
+    writes = []
+    timer = ManualTimer()
+    ramps = Ramps(channels, lambda handle, duty: writes.append((handle, duty)),
+                  timer, period)
+    return ramps, timer, writes
+
+
+def test_ramp_reaches_target_and_stops_timer():
+    ramps, timer, writes = create_ramps()
+    ramps.start(0, 1000, 40)
+    assert timer.period == 10
+    assert ramps.active(0)
+
+    timer.fire(4)
+    assert writes == [(0, 250), (0, 500), (0, 750), (0, 1000)]
+    assert not ramps.active(0)
+    assert timer.callback is None
+    assert ramps.duties[0] == 1000
+
+
+def test_ramp_starts_from_the_current_duty():
+    ramps, timer, writes = create_ramps()
+    ramps.written(1, 1000)
+    ramps.start(1, 0, 20)
+    timer.fire(2)
+    assert writes == [(1, 500), (1, 0)]
+
+
+def test_zero_duration_is_written_right_away():
+    ramps, timer, writes = create_ramps()
+    ramps.start(0, 300, 0)
+    assert writes == [(0, 300)]
+    assert timer.callback is None
+
+
+def test_direct_write_stops_a_ramp():
+    ramps, timer, writes = create_ramps()
+    ramps.start(0, 1000, 100)
+    ramps.start(1, 1000, 20)
+    timer.fire()
+    ramps.written_frame((0, None), [42, 7])
+    timer.fire(2)
+
+    assert writes[0] == (0, 99)
+    assert writes[-1] == (1, 1000)
+    assert ramps.duties[0] == 42
+    assert not ramps.active(0)
+    assert timer.callback is None
+
+
+def test_unchanged_duty_is_not_written():
+    ramps, timer, writes = create_ramps()
+    ramps.start(0, 2, 100)
+    timer.fire(10)
+    assert writes == [(0, 1), (0, 2)]
+
+
+def test_running_ramp_is_taken_over():
+    ramps, timer, writes = create_ramps()
+    ramps.start(0, 1000, 40)
+    timer.fire()
+    ramps.start(0, 0, 20)
+    timer.fire(3)
+
+    assert writes == [(0, 250), (0, 125), (0, 0)]
+    assert timer.callback is None
+
+
+def interrupted(timer, method, *args):
+    """Call a method firing the timer before every line of it."""
+    code = method.__func__.__code__
+
+    def trace(frame, event, _arg):
+        if frame.f_code is not code:
+            return None
+        if event == 'line':
+            timer.fire()
+        return trace
+
+    sys.settrace(trace)
+    try:
+        method(*args)
+    finally:
+        sys.settrace(None)
+
+
+def test_ramps_survive_interrupts_while_being_started():
+    ramps, timer, writes = create_ramps()
+    ramps.start(1, 500, 10)
+    interrupted(timer, ramps.start, 0, 1000, 40)
+    # the ramp of the first channel ended within the calls
+    assert (1, 500) in writes
+    assert ramps.active(0)
+    assert timer.callback is not None
+
+    interrupted(timer, ramps.written, 0, 7)
+    timer.fire()
+    assert not ramps.active(0)
+    assert ramps.duties[0] == 7
+    assert timer.callback is None
+
+
+def test_host_timer_calls_back():
+    called = Event()
+    timer = Timer()
+    timer.init(mode=Timer.PERIODIC, period=1,
+               callback=lambda _timer: called.set())
+    assert called.wait(1)
+    timer.deinit()
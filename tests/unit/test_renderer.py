@@ -0,0 +1,109 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from pico_copilot.modules.animations.animation import Animation  # noqa: E402
+from pico_copilot.modules.animations.generators import (  # noqa: E402
+    GENERATORS,
+)
+from pico_copilot.modules.animations.loader import (  # noqa: E402
+    read_animations,
+)
+from pico_copilot.modules.animations.renderer import (  # noqa: E402
+    compare,
+    energy,
+    render,
+    render_generator,
+)
+from pico_copilot.utils.fixed import MAX_DUTY  # noqa: E402
+
+TICKS = 600
+# parameters of every generator, each one is checked
+GENERATOR_PARAMS = [
+    ('breathe', 1, {}),
+    ('breathe', 5, {'period': 0.7, 'low': 0.1, 'high': 0.9, 'shift': 0.13,
+                    'cycles': 3}),
+    ('chase', 4, {}),
+    ('chase', 6, {'step': 0.03, 'phases': 3, 'on': 0.8, 'off': 0.1,
+                  'bounce': True, 'cycles': 2}),
+    ('chase', 1, {'bounce': True}),
+    ('strobe', 4, {}),
+    ('strobe', 2, {'period': 0.33, 'duty': 0.2, 'on': 0.6, 'off': 0.05,
+                   'cycles': 4}),
+    ('ramp', 3, {}),
+    ('ramp', 2, {'duration': 0.45, 'start': 0.9, 'end': 0.2, 'cycles': 3}),
+]
+
+
+def play(name, tick_length, ticks, repeat):
+    """Play an animation on a virtual clock like the compositor does."""
+    tick_ms = round(tick_length * 1000)
+    now = [0]
+    animation = Animation(name, tick_length, lambda: now[0])
+    frames = []
+    for _ in range(ticks):
+        if animation.finished:
+            if not repeat:
+                frames.append(frames[-1])
+                continue
+            animation.reset()
+            now[0] = 0
+        frames.append(list(animation.generate_frame()))
+        now[0] += tick_ms
+    return np.array(frames).T
+
+
+@pytest.mark.parametrize('name', sorted(read_animations()))
+@pytest.mark.parametrize('tick_length', [0.01, 0.015])
+@pytest.mark.parametrize('repeat', [True, False])
+def test_render_matches_playback(name, tick_length, repeat):
+    frames = render(name, tick_length, TICKS, repeat)
+    expected = play(name, tick_length, TICKS, repeat)
+    assert np.array_equal(frames, expected)
+
+
+def test_generator_params_cover_all_generators():
+    assert {name for name, _leds, _params in GENERATOR_PARAMS} == set(
+        GENERATORS)
+
+
+@pytest.mark.parametrize('name, leds, params', GENERATOR_PARAMS)
+@pytest.mark.parametrize('tick_ms', [10, 7])
+def test_generator_render_matches_brightness(name, leds, params, tick_ms):
+    generator = GENERATORS[name](leds, **params)
+    frames = render_generator(generator, tick_ms)
+
+    times = [min(tick * tick_ms, generator.duration)
+             for tick in range(frames.shape[1])]
+    assert times[-1] == generator.duration
+    expected = [[generator.brightness(led, time) for time in times]
+                for led in range(leds)]
+    assert np.array_equal(frames, expected)
+
+
+def test_cycle_ends_with_finishing_frame():
+    frames = render('strobe', 0.01)
+    # 10 cycles of 100 ms and the finishing frame
+    assert frames.shape == (4, 101)
+    assert frames.dtype == np.uint16
+
+
+def test_once_holds_last_frame():
+    cycle = render('strobe', 0.01)
+    frames = render('strobe', 0.01, 150, repeat=False)
+    assert (frames[:, cycle.shape[1]:] == cycle[:, -1:]).all()
+
+
+def test_energy():
+    frames = np.array([[MAX_DUTY] * 100, [0] * 100], dtype=np.uint16)
+    assert list(energy(frames, 0.01)) == pytest.approx([1.0, 0.0])
+
+
+def test_compare():
+    frames = render('normal', 0.01)
+    golden = frames.copy()
+    assert compare(frames, golden) is None
+    golden[1, 7] += 1
+    assert compare(frames, golden) == (1, 7)
+    with pytest.raises(ValueError):
+        compare(frames, golden[:, 1:])
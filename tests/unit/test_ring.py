@@ -0,0 +1,28 @@
+from pico_copilot.utils.ring import RingBuffer
+
+
+def create_ring(size):
+    return RingBuffer([None] * size, [None] * size)
+
+
+def test_pairs_are_popped_in_order_and_wrap():
+    ring = create_ring(4)
+    for index in range(10):
+        ring.push('INFO', index)
+        ring.push('DEBUG', index)
+        assert len(ring) == 2
+        assert ring.pop() == ('INFO', index)
+        assert ring.pop() == ('DEBUG', index)
+    assert ring.pop() is None
+    assert len(ring) == 0
+
+
+def test_full_ring_drops_new_pairs():
+    ring = create_ring(3)
+    for index in range(4):
+        ring.push(index, -index)
+    assert len(ring) == 2
+    assert ring.dropped == 2
+    assert ring.pop() == (0, 0)
+    ring.push(4, -4)
+    assert [ring.pop(), ring.pop(), ring.pop()] == [(1, -1), (4, -4), None]
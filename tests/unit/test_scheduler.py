@@ -0,0 +1,74 @@
+from pico_copilot.modules.modes import NormalMode
+
+TICK_MS = 10
+
+
+def start_normal_mode(control):
+    control._update_mode(NormalMode(control._state))
+    for timing in control.timings:
+        timing.reset()
+
+
+def updates(control):
+    """Return update counts per module name."""
+    return {timing.name: timing.count for timing in control._module_timings}
+
+
+def run_ticks(control, clock, ticks, tick_ms=TICK_MS):
+    for _ in range(ticks):
+        control._process_tick()
+        clock.now += tick_ms
+
+
+def test_modules_are_updated_at_their_own_periods(control, clock):
+    start_normal_mode(control)
+    run_ticks(control, clock, 200)
+
+    counts = updates(control)
+    assert counts['tail_leds'] == 200
+    assert counts['front_leds'] == 200
+    assert counts['status_leds'] == 200 * TICK_MS // 40
+    # once a second from the start
+    assert counts['sensors'] == 2
+    # the button is polled until its first update finds nothing
+    assert counts['button1'] == 1
+
+
+def test_late_ticks_do_not_catch_up(control, clock):
+    start_normal_mode(control)
+    run_ticks(control, clock, 1)
+    # a single late tick after 95 ms
+    clock.now += 85
+    run_ticks(control, clock, 1)
+
+    counts = updates(control)
+    assert counts['tail_leds'] == 2
+    assert counts['status_leds'] == 2
+    # the next periods start from the late tick
+    due = dict(zip(updates(control), control._due))
+    assert due['tail_leds'] == 95 + 10
+    assert due['status_leds'] == 95 + 40
+
+
+def test_next_due_is_the_earliest_module_with_updates(control, clock):
+    start_normal_mode(control)
+    run_ticks(control, clock, 1)
+    assert control._next_due() == 10
+
+    for module in control._module_list:
+        if module is not control._modules['sensors']:
+            module.updates_available = False
+    assert control._next_due() == 1000
+
+    control._modules['sensors'].updates_available = False
+    assert control._next_due() is None
+
+
+def test_button_edge_schedules_the_button(control, board, clock):
+    start_normal_mode(control)
+    run_ticks(control, clock, 1)
+    assert not control._button.updates_available
+
+    board.set_button(True)
+    run_ticks(control, clock, 1)
+    assert updates(control)['button1'] == 2
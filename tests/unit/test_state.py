@@ -0,0 +1,181 @@
+import copy
+
+import pytest
+
+from pico_copilot.board.state import STATE
+from pico_copilot.modules.state import (
+    ANIMATION_FINISHED,
+    BUTTON_EVENTS,
+    CHANGES_MASK,
+    SENSOR,
+    State,
+)
+
+
+def test_state_does_not_share_the_dict():
+    source = copy.deepcopy(STATE)
+    state = State(source)
+    state.set_led_brightness('tail', 'tail_2', 0.25)
+    state.set_leds_animation_playing('tail', 'normal')
+    state.set_sensor('light', 0.75)
+
+    assert source == STATE
+    assert state.get_leds_brightness('tail')['tail_2']['brightness'] == 0.25
+    assert state.get_leds_animation_playing('tail') == 'normal'
+    assert state.get_sensor('light') == 0.75
+
+
+def test_handles_and_names_reach_the_same_state():
+    state = State(STATE)
+    leds = state.get_leds_handle('front')
+    led = state.get_led_names('front').index('front_3')
+
+    state.set_led_duty_at(leds, led, 1234)
+    state.set_leds_animation_finished_at(leds, True)
+    assert state.get_leds_brightness('front')['front_3']['duty'] == 1234
+    assert state.get_leds_animation_finished('front')
+
+    state.set_led_duty('front', 'front_3', 42)
+    assert state.get_leds_brightness('front')['front_3']['duty'] == 42
+
+
+def test_button_events_are_retrieved_once():
+    state = State(STATE)
+    assert not state.has_button_events('button1')
+
+    state.add_button_event('button1', 'double_click')
+    assert state.has_button_events('button1')
+    assert tuple(state.get_button_events('button1')) == (
+        'single_click', 'double_click', 'long_click')
+    assert state.retrieve_button_event('button1', 'double_click')
+    assert not state.retrieve_button_event('button1', 'double_click')
+    assert not state.has_button_events('button1')
+
+
+def test_update_keeps_handles():
+    state = State(STATE)
+    leds = state.get_leds_handle('status')
+    changed = copy.deepcopy(STATE)
+    changed['leds']['status']['state']['animation_mode'] = 'once'
+    state.update(changed)
+
+    assert state.get_leds_handle('status') == leds
+    assert state.get_leds_animation_mode('status') == 'once'
+
+
+def test_update_keeps_handles_of_reordered_groups():
+    state = State(STATE)
+    handles = {group: state.get_leds_handle(group)
+               for group in ('tail', 'front', 'status')}
+    changed = copy.deepcopy(STATE)
+    changed['leds'] = dict(reversed(list(changed['leds'].items())))
+    changed['leds']['side'] = copy.deepcopy(STATE['leds']['status'])
+    changed['leds']['front']['state']['animation_playing'] = 'blink'
+    state.update(changed)
+
+    for group, handle in handles.items():
+        assert state.get_leds_handle(group) == handle
+    assert state.get_leds_handle('side') == 3
+    state.set_led_duty_at(handles['front'], 0, 7)
+    assert state.get_leds_brightness('front')['front_1']['duty'] == 7
+    assert state.get_leds_animation_playing('front') == 'blink'
+
+
+def test_update_does_not_change_leds_of_a_group():
+    state = State(STATE)
+    changed = copy.deepcopy(STATE)
+    changed['sensors']['light']['value'] = 0.9
+    del changed['leds']['tail']['leds']['tail_4']
+    with pytest.raises(ValueError):
+        state.update(changed)
+    assert len(state.get_led_names('tail')) == 4
+    assert state.get_sensor('light') == STATE['sensors']['light']['value']
+
+
+def test_brightness_keeps_the_set_value():
+    state = State(STATE)
+    state.set_all_leds_brightness('tail', 0.3)
+    state.set_led_brightness('front', 'front_1', 0.1)
+    assert state.get_leds_brightness('tail')['tail_4']['brightness'] == 0.3
+    assert state.get_leds_brightness('front')['front_1']['brightness'] == 0.1
+
+
+def test_watcher_sees_changes_only():
+    state = State(STATE)
+    light = state.watch(SENSOR, 'light')
+    # the initial value counts as a change
+    assert light.retrieve_changed()
+    assert not light.retrieve_changed()
+
+    state.set_sensor('light', state.get_sensor('light'))
+    assert not light.retrieve_changed()
+    state.set_sensor('light', 0.1)
+    assert light.retrieve_changed()
+    assert not light.retrieve_changed()
+
+
+def test_watchers_do_not_clear_changes_for_each_other():
+    state = State(STATE)
+    first = state.watch(ANIMATION_FINISHED, 'front')
+    second = state.watch(ANIMATION_FINISHED, 'front')
+    first.retrieve_changed()
+    second.retrieve_changed()
+
+    state.set_leds_animation_finished('front', True)
+    assert first.retrieve_changed()
+    state.set_leds_animation_finished('front', False)
+    assert second.retrieve_changed()
+    assert not second.retrieve_changed()
+    # both changes are seen as one by a slower consumer
+    assert first.retrieve_changed()
+    assert not first.retrieve_changed()
+
+
+def test_change_counter_wraps_within_small_ints():
+    state = State(STATE)
+    light = state.watch(SENSOR, 'light')
+    state._sensors['light'].watch.changes = CHANGES_MASK
+    light.retrieve_changed()
+    state.set_sensor('light', 0.2)
+    assert state._sensors['light'].watch.changes == 0
+    assert light.retrieve_changed()
+
+
+def test_leds_types_are_in_the_order_of_handles():
+    state = State(STATE)
+    types = state.get_leds_types()
+    assert types == tuple(STATE['leds'])
+    assert [state.get_leds_handle(led_type) for led_type in types] == [
+        0, 1, 2]
+
+
+def test_subscribers_are_called_on_changes():
+    state = State(STATE)
+    finished = []
+    events = []
+    state.subscribe(ANIMATION_FINISHED, 'tail', finished.append)
+    state.subscribe(BUTTON_EVENTS, 'button1', events.append)
+
+    state.set_leds_animation_finished('tail', False)
+    state.set_leds_animation_finished_at(state.get_leds_handle('tail'), True)
+    state.set_leds_animation_finished('front', True)
+    state.add_button_event('button1', 'long_click')
+
+    assert finished == [True]
+    assert len(events) == 1
+
+
+def test_update_keeps_subscribers():
+    state = State(STATE)
+    values = []
+    state.subscribe(SENSOR, 'light', values.append)
+    light = state.watch(SENSOR, 'light')
+    light.retrieve_changed()
+
+    changed = copy.deepcopy(STATE)
+    changed['sensors']['light']['value'] = 0.9
+    state.update(changed)
+    state.set_sensor('light', 0.3)
+
+    assert values == [0.9, 0.3]
+    assert light.retrieve_changed()
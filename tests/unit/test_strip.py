@@ -0,0 +1,70 @@
+from array import array
+
+from pico_copilot.board.strip import Strip
+
+
+class RecordingDriver:
+    """Led strip driver stand-in keeping copies of flushed buffers."""
+
+    def __init__(self):
+        self.buffers = []
+
+    def write(self, buffer):
+        self.buffers.append(bytes(buffer))
+
+
+def test_frame_is_written_in_wire_order():
+    driver = RecordingDriver()
+    strip = Strip(3, driver, color=(255, 128, 0), order='GRB')
+    strip.set_frame(array('H', [65535, 32768, 0]))
+    strip.flush()
+    assert driver.buffers == [bytes([128, 255, 0, 64, 127, 0, 0, 0, 0])]
+
+
+def test_rgb_order():
+    driver = RecordingDriver()
+    strip = Strip(1, driver, color=(255, 128, 0), order='RGB')
+    strip.fill(65535)
+    strip.flush()
+    assert driver.buffers == [bytes([255, 128, 0])]
+
+
+def test_flush_sends_only_changes():
+    driver = RecordingDriver()
+    strip = Strip(2, driver)
+    assert strip.flush()
+    assert not strip.flush()
+    strip.set_frame([65535, 0])
+    assert strip.flush()
+    assert driver.buffers == [bytes(6), bytes([255] * 3 + [0] * 3)]
+
+
+def test_levels_are_scaled_to_the_full_color():
+    driver = RecordingDriver()
+    strip = Strip(1, driver, color=(255, 1, 128), order='RGB')
+    for level, expected in ((0, [0, 0, 0]),
+                            (257, [1, 0, 0]),
+                            (32767, [127, 0, 64]),
+                            (65535, [255, 1, 128])):
+        strip.fill(level)
+        assert list(strip.buffer) == expected
+        strip.set_frame([level])
+        assert list(strip.buffer) == expected
+
+
+def test_short_frame_is_stretched_over_the_strip():
+    driver = RecordingDriver()
+    strip = Strip(6, driver, color=(255, 0, 0), order='RGB')
+    strip.set_frame(array('H', [65535, 0, 32767]))
+    assert list(strip.buffer[::3]) == [255, 255, 0, 0, 127, 127]
+
+
+def test_pixels_are_written_in_place():
+    driver = RecordingDriver()
+    strip = Strip(2, driver)
+    buffer = strip.buffer
+    strip.pixels[3:6] = bytes([1, 2, 3])
+    strip.mark_dirty()
+    strip.flush()
+    assert strip.buffer is buffer
+    assert driver.buffers[-1] == bytes([0, 0, 0, 1, 2, 3])
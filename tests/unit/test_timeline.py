@@ -0,0 +1,71 @@
+from array import array
+
+import pytest
+
+from pico_copilot.modules.animations.timeline import (
+    CURVE_NAMES,
+    CURVES,
+    Timeline,
+)
+from pico_copilot.utils.fixed import MAX_DUTY, SCALE
+
+INTERPOLATED = [index for index, curve in enumerate(CURVES) if curve]
+
+
+@pytest.mark.parametrize('curve', INTERPOLATED)
+def test_curve_endpoints(curve):
+    assert CURVES[curve](0) == 0
+    assert CURVES[curve](SCALE) == SCALE
+
+
+@pytest.mark.parametrize('curve', INTERPOLATED)
+def test_curve_is_monotonic_within_the_scale(curve):
+    values = [CURVES[curve](progress) for progress in range(SCALE + 1)]
+    assert values == sorted(values)
+    assert 0 <= min(values) and max(values) <= SCALE
+
+
+@pytest.mark.parametrize('name, midpoint', [
+    ('linear', SCALE // 2),
+    ('ease_in', SCALE // 4),
+    ('ease_out', 3 * SCALE // 4),
+    ('ease_in_out', SCALE // 2),
+])
+def test_curve_midpoint(name, midpoint):
+    assert CURVES[CURVE_NAMES.index(name)](SCALE // 2) == midpoint
+
+
+def transition(curve):
+    """A led going from 0 to full brightness in 1000 ms."""
+    return Timeline(array('H', [0, 1000]),
+                    array('H', [0, MAX_DUTY]),
+                    array('H', [0, 2]),
+                    2,
+                    curve)
+
+
+@pytest.mark.parametrize('curve', INTERPOLATED)
+def test_brightness_at_transition_ends(curve):
+    timeline = transition(curve)
+    assert timeline.brightness_at(0, 1, 0) == 0
+    assert timeline.brightness_at(0, 1, 1000) == MAX_DUTY
+    assert timeline.brightness_at(0, 1, 5000) == MAX_DUTY
+
+
+@pytest.mark.parametrize('curve', INTERPOLATED)
+def test_brightness_at_is_monotonic(curve):
+    timeline = transition(curve)
+    values = [timeline.brightness_at(0, 1, elapsed)
+              for elapsed in range(1001)]
+    assert values == sorted(values)
+
+
+def test_linear_brightness_at_midpoint():
+    timeline = transition(CURVE_NAMES.index('linear'))
+    assert timeline.brightness_at(0, 1, 500) == MAX_DUTY // 2
+
+
+def test_step_and_first_keyframes_are_not_interpolated():
+    assert transition(0).brightness_at(0, 1, 500) == MAX_DUTY
+    linear = transition(CURVE_NAMES.index('linear'))
+    assert linear.brightness_at(0, 0, 0) == 0